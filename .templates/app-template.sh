@@ -8,6 +8,10 @@
 # CHECK_COMMAND: [command-to-check-if-installed]
 # REQUIRES: [comma-separated-dependencies]
 # CONFLICTS: [comma-separated-conflicting-packages]
+# RESOURCES: [optional: dpkg-lock,network,gsettings,cpu - detected if omitted]
+# ARTIFACTS: [optional: URLs fetched with bentobox_fetch]
+# ESTIMATED_TIME: [optional: typical install time, e.g. 2m]
+# INTERACTIVE: [optional: yes if it prompts the user - detected if omitted]
 # AUTHOR: [Your Name or Organization]
 # VERSION: 1.0
 
@@ -14,4 +14,9 @@ for file in $OMAKUB_PATH/migrations/*.sh; do
   fi
 done
 
+# Re-run only the installers whose fingerprint changed with this update
+if [ -f ~/.bentobox-state.json ]; then
+  python3 $OMAKUB_PATH/install/orchestrator.py --resume --skip-post-install
+fi
+
 cd -
@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Bentobox Artifact Cache
+Shared, content-addressed store for installer downloads (tarballs, zips,
+.debs) with HTTP revalidation and a size cap, plus a parallel prefetcher.
+
+Usable from Python and from bash:
+    
+    python3 install/artifacts.py fetch <url> [--sha256 HASH] [--output FILE]
+    python3 install/artifacts.py prune
+"""
+
+import os
+import sys
+import json
+import time
+import fcntl
+import shutil
+import hashlib
+import argparse
+import threading
+import urllib.error
+import urllib.request
+from pathlib import Path
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Dict, Iterable, List, Optional
+
+ARTIFACT_DIR = Path(os.environ.get('BENTOBOX_ARTIFACT_DIR', Path.home() / '.cache/bentobox/artifacts'))
+DEFAULT_MAX_SIZE = int(os.environ.get('BENTOBOX_ARTIFACT_CACHE_MB', 2048)) * 1024 ** 2
+DEFAULT_MAX_AGE = 600  # Seconds a fetched artifact is trusted without asking the server
+
+
+class ArtifactCache:
+    """Content-addressed artifact store
+    
+    Files live under blobs/<sha256>; index.json maps each URL to the blob it
+    last resolved to along with the server's ETag / Last-Modified, so later
+    fetches can be answered with a conditional request (or none at all
+    within `max_age`). When the store grows past `max_size`, the least
+    recently used blobs are evicted. The index is guarded by a file lock so
+    the orchestrator and bash installers can use the store at the same time.
+    """
+    
+    def __init__(self, root: Path = ARTIFACT_DIR, max_size: int = DEFAULT_MAX_SIZE,
+                 max_age: int = DEFAULT_MAX_AGE, timeout: int = 30):
+        self.root = Path(root)
+        self.blobs = self.root / 'blobs'
+        self.index_file = self.root / 'index.json'
+        self.max_size = max_size
+        self.max_age = max_age
+        self.timeout = timeout
+        self.downloaded: Dict[str, int] = {}  # url → bytes this instance fetched over the network
+    
+    def fetch(self, url: str, sha256: Optional[str] = None) -> Path:
+        """Return a local path for url, downloading or revalidating as needed"""
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        
+        if sha256 and (self.blobs / sha256).exists():
+            self._touch(url, sha256)
+            return self.blobs / sha256
+        
+        with self._index() as index:
+            entry = dict(index.get(url) or {})
+        cached = self.blobs / entry['sha256'] if entry.get('sha256') else None
+        if cached is not None and (not cached.exists() or sha256):
+            cached, entry = None, {}  # A pinned checksum we don't have means new content
+        
+        if cached is not None and time.time() - entry.get('validated', 0) < self.max_age:
+            self._touch(url, entry['sha256'])
+            return cached
+        
+        headers = {'User-Agent': 'bentobox'}
+        if cached is not None:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        try:
+            request = urllib.request.Request(url, headers=headers)
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                digest, size = self._store(response, sha256)
+                etag = response.headers.get('ETag')
+                last_modified = response.headers.get('Last-Modified')
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached is not None:
+                self._touch(url, entry['sha256'], validated=True)
+                return cached
+            raise
+        except OSError:
+            if cached is not None:
+                return cached  # Offline: a stale copy beats no copy
+            raise
+        
+        self.downloaded[url] = self.downloaded.get(url, 0) + size
+        now = time.time()
+        with self._index() as index:
+            index[url] = {
+                'sha256': digest,
+                'size': size,
+                'etag': etag,
+                'last_modified': last_modified,
+                'validated': now,
+                'last_used': now,
+            }
+        self.prune(keep={digest})  # Never the blob we're about to hand out
+        return self.blobs / digest
+    
+    def fetch_to(self, url: str, output: Path, sha256: Optional[str] = None) -> Path:
+        """Fetch url and place a copy at output"""
+        # A copy rather than a link, so installers can't modify the cached blob
+        shutil.copyfile(self.fetch(url, sha256), output)
+        return Path(output)
+    
+    def prune(self, max_size: Optional[int] = None, keep: Iterable[str] = ()) -> int:
+        """Evict least recently used blobs until the store fits, returning bytes freed
+        
+        Blobs whose digest is in keep stay, even if the store still doesn't fit.
+        """
+        max_size = self.max_size if max_size is None else max_size
+        freed = 0
+        with self._index() as index:
+            last_used: Dict[str, float] = {}
+            for entry in index.values():
+                blob = entry.get('sha256')
+                if blob:
+                    last_used[blob] = max(last_used.get(blob, 0), entry.get('last_used', 0))
+            
+            sizes = {}
+            for blob in self.blobs.iterdir() if self.blobs.exists() else []:
+                if blob.name.endswith('.part'):
+                    continue
+                sizes[blob.name] = blob.stat().st_size
+            total = sum(sizes.values())
+            
+            for blob in sorted(sizes, key=lambda b: last_used.get(b, 0)):
+                if total <= max_size:
+                    break
+                if blob in keep:
+                    continue
+                (self.blobs / blob).unlink(missing_ok=True)
+                total -= sizes[blob]
+                freed += sizes[blob]
+            
+            for url in [u for u, e in index.items() if e.get('sha256') not in sizes or
+                        not (self.blobs / e['sha256']).exists()]:
+                del index[url]
+        return freed
+    
+    def _store(self, response, expected: Optional[str] = None) -> tuple:
+        """Stream a response into the blob store, returning (sha256, size)"""
+        digest = hashlib.sha256()
+        size = 0
+        tmp_file = self.blobs / f'{os.getpid()}-{threading.get_ident()}.part'
+        try:
+            with open(tmp_file, 'wb') as f:
+                while True:
+                    chunk = response.read(1024 * 1024)
+                    if not chunk:
+                        break
+                    digest.update(chunk)
+                    f.write(chunk)
+                    size += len(chunk)
+            if expected and digest.hexdigest() != expected:
+                raise ValueError(f"Checksum mismatch: expected {expected}, got {digest.hexdigest()}")
+            os.replace(tmp_file, self.blobs / digest.hexdigest())
+        finally:
+            tmp_file.unlink(missing_ok=True)
+        return digest.hexdigest(), size
+    
+    def _touch(self, url: str, sha256: str, validated: bool = False):
+        now = time.time()
+        with self._index() as index:
+            entry = index.setdefault(url, {'sha256': sha256})
+            entry['last_used'] = now
+            if validated:
+                entry['validated'] = now
+    
+    @contextmanager
+    def _index(self):
+        """Read-modify-write the index under an exclusive lock"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / 'index.lock', 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                index = json.loads(self.index_file.read_text())
+            except (OSError, ValueError):
+                index = {}
+            before = json.dumps(index, sort_keys=True)
+            yield index
+            if json.dumps(index, sort_keys=True) != before:
+                tmp_file = self.index_file.with_suffix('.tmp')
+                tmp_file.write_text(json.dumps(index, indent=2))
+                os.replace(tmp_file, self.index_file)
+
+
+class ArtifactPrefetcher:
+    """Parallel downloader into an ArtifactCache with a per-host connection limit"""
+    
+    def __init__(self, cache: Optional[ArtifactCache] = None, max_workers: int = 8, per_host: int = 2):
+        self.cache = cache or ArtifactCache()
+        self.per_host = per_host
+        self.downloads: Dict[str, Future] = {}
+        
+        self._pool = ThreadPoolExecutor(max_workers=max_workers)
+        self._hosts: Dict[str, threading.Semaphore] = {}
+        self._hosts_lock = threading.Lock()
+    
+    def prefetch(self, urls: List[str]) -> List[Future]:
+        """Start fetching urls in the background, returning their futures"""
+        futures = []
+        for url in urls:
+            if url not in self.downloads:
+                self.downloads[url] = self._pool.submit(self._download, url)
+            futures.append(self.downloads[url])
+        return futures
+    
+    def shutdown(self):
+        """Cancel downloads that haven't started yet"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+    
+    def _download(self, url: str) -> int:
+        """Fetch one url into the cache, returning the bytes downloaded (0 when cached)"""
+        with self._host_slot(urlparse(url).hostname or ''):
+            self.cache.fetch(url)
+        return self.cache.downloaded.get(url, 0)
+    
+    def _host_slot(self, host: str) -> threading.Semaphore:
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = threading.Semaphore(self.per_host)
+            return self._hosts[host]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bentobox artifact cache")
+    parser.add_argument('--max-size-mb', type=int, help="Cache size cap in MiB")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    
+    fetch = subparsers.add_parser('fetch', help="Fetch a URL through the cache and print its path")
+    fetch.add_argument('url')
+    fetch.add_argument('--sha256', help="Expected checksum of the content")
+    fetch.add_argument('--output', help="Copy the artifact here instead of printing the cache path")
+    
+    subparsers.add_parser('prune', help="Evict least recently used artifacts over the size cap")
+    args = parser.parse_args()
+    
+    cache = ArtifactCache()
+    if args.max_size_mb is not None:
+        cache.max_size = args.max_size_mb * 1024 ** 2
+    
+    try:
+        if args.command == 'fetch':
+            if args.output:
+                cache.fetch_to(args.url, Path(args.output), args.sha256)
+            else:
+                print(cache.fetch(args.url, args.sha256))
+            
+            # Lets the orchestrator attribute download bytes to the installer
+            if os.environ.get('BENTOBOX_ARTIFACT_LOG'):
+                with open(os.environ['BENTOBOX_ARTIFACT_LOG'], 'a') as log:
+                    log.write(f"{cache.downloaded.get(args.url, 0)}\t{args.url}\n")
+        elif args.command == 'prune':
+            print(f"Freed {cache.prune() // 1024 ** 2} MiB")
+    except Exception as e:
+        print(f"❌ {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Bentobox Orchestrator Benchmark
+Times the orchestrator against synthetic installer trees, so scheduler and
+state-store changes can be measured without apt, a network or a desktop.
+
+    python3 install/benchmark.py                        # 10, 100, 1000 stubs
+    python3 install/benchmark.py --sizes 100 --shape tree --failure-rate 0.1
+
+Results are appended to ~/.cache/bentobox/benchmark.jsonl together with
+the git revision, and each run is compared with the last result recorded
+for the same scenario.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+import yaml
+
+INSTALL_DIR = Path(__file__).resolve().parent
+REPO_DIR = INSTALL_DIR.parent
+RESULTS_FILE = Path.home() / '.cache/bentobox/benchmark.jsonl'
+
+SHAPES = ['flat', 'chain', 'fanout', 'tree', 'random']
+
+
+def build_tree(root: Path, size: int, shape: str, sleep: float, output_bytes: int,
+               failure_rate: float, probe_rate: float, contention: float, seed: int):
+    """Write an OMAKUB_PATH tree of stub installers
+    
+    Each stub declares its prerequisites and check command in a manifest
+    header, like the real installers.
+    """
+    rng = random.Random(seed)
+    terminal_dir = root / 'install/terminal'
+    terminal_dir.mkdir(parents=True)
+    (root / 'install/lib').mkdir()
+    for helper in ('artifacts.sh', 'utils.sh'):
+        if (INSTALL_DIR / 'lib' / helper).exists():
+            (root / 'install/lib' / helper).write_text((INSTALL_DIR / 'lib' / helper).read_text())
+    
+    names = [f'stub_{i:04d}' for i in range(size)]
+    for i, name in enumerate(names):
+        if shape == 'chain':
+            prerequisites = names[i - 1:i] if i else []
+        elif shape == 'fanout':
+            prerequisites = [names[0]] if i else []
+        elif shape == 'tree':
+            prerequisites = [names[(i - 1) // 2]] if i else []
+        elif shape == 'random':
+            prerequisites = rng.sample(names[:i], min(i, rng.randint(0, 3)))
+        else:
+            prerequisites = []
+        
+        # Shell syntax forces the preflight to actually run the command
+        check = f'test -e /nonexistent/{name} && true' if rng.random() < probe_rate else None
+        
+        lines = ['#!/bin/bash']
+        if check:
+            lines.append(f'# CHECK_COMMAND: {check}')
+        if prerequisites:
+            lines.append(f"# REQUIRES: {', '.join(prerequisites)}")
+        lines.append('# Synthetic installer generated by install/benchmark.py')
+        if rng.random() < contention:
+            # Never runs, but makes the orchestrator hold the gsettings lock
+            lines.append('if false; then gsettings set org.bentobox.benchmark key value; fi')
+        if output_bytes:
+            lines.append(f"head -c {output_bytes} /dev/zero | tr '\\0' '.' | fold -w 79")
+        if sleep:
+            lines.append(f'sleep {sleep}')
+        lines.append('exit 1' if rng.random() < failure_rate else 'exit 0')
+        (terminal_dir / f"app-{name.replace('_', '-')}.sh").write_text('\n'.join(lines) + '\n')
+
+
+@contextmanager
+def quiet(log_file: Path):
+    """Send stdout/stderr of this process and its children to a log file"""
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    with open(log_file, 'a') as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            yield
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def timed(timings: Dict[str, List[float]], phase: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings.setdefault(phase, []).append(time.perf_counter() - start)
+    return result
+
+
+def run_scenario(args, size: int, workdir: Path) -> Dict[str, float]:
+    """Median time of every orchestrator phase for one tree size"""
+    from detection import CACHE_FILE
+    from manifest import MANIFEST_FILE
+    from orchestrator import InstallationOrchestrator
+    
+    root = workdir / f'tree-{size}'
+    build_tree(root, size, args.shape, args.sleep, args.output_bytes,
+                       args.failure_rate, args.probe_rate, args.contention, args.seed)
+    config_file = root / 'bentobox-config.yaml'
+    config_file.write_text(yaml.safe_dump({
+        'mode': 'unattended',
+        'settings': {'max_parallel': args.jobs, 'adaptive_parallel': False, 'batch_apt': False, 'resume': False},
+    }))
+    
+    os.environ['OMAKUB_PATH'] = str(root)
+    log_file = workdir / 'orchestrator.log'
+    timings: Dict[str, List[float]] = {}
+    
+    def reset():
+        """Start from a machine that has never run Bentobox"""
+        for leftover in Path.home().glob('.bentobox-state.*'):
+            leftover.unlink()
+        CACHE_FILE.unlink(missing_ok=True)
+        MANIFEST_FILE.unlink(missing_ok=True)
+    
+    for _ in range(args.repeat):
+        with quiet(log_file):
+            # Each phase on its own
+            reset()
+            orchestrator = InstallationOrchestrator(str(config_file), post_install=False)
+            orchestrator.load_config()
+            orchestrator.load_state()
+            timed(timings, 'discover_cold', orchestrator.discover_components)
+            timed(timings, 'discover_warm', orchestrator.discover_components)
+            timed(timings, 'preflight_cold', orchestrator.run_preflight_check)
+            timed(timings, 'preflight_warm', orchestrator.run_preflight_check)
+            orchestrator.apply_user_preferences()
+            timed(timings, 'fingerprint', orchestrator.apply_previous_state)
+            queue = timed(timings, 'queue', orchestrator.build_install_queue)
+            timed(timings, 'save_snapshot', orchestrator.save_state)
+            
+            start = time.perf_counter()
+            for comp in queue:
+                orchestrator.save_state(comp)
+            timings.setdefault('save_record', []).append((time.perf_counter() - start) / max(1, len(queue)))
+            orchestrator.state_store.close()
+            
+            # End to end, installers included
+            reset()
+            orchestrator = InstallationOrchestrator(str(config_file), post_install=False, sudo_session=False)
+            timed(timings, 'run', orchestrator.run)
+    
+    shutil.rmtree(root)
+    return {phase: statistics.median(values) for phase, values in timings.items()}
+
+
+def git_revision() -> str:
+    try:
+        rev = subprocess.run(['git', '-C', str(REPO_DIR), 'rev-parse', '--short', 'HEAD'],
+                             capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', '-C', str(REPO_DIR), 'status', '--porcelain', '--untracked-files=no'],
+                               capture_output=True, text=True).stdout.strip()
+        return f'{rev}-dirty' if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def previous_result(results_file: Path, scenario: dict) -> Optional[dict]:
+    """Most recent recorded result for the same scenario"""
+    if not results_file.exists():
+        return None
+    match = None
+    for line in results_file.read_text().splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('scenario') == scenario:
+            match = record
+    return match
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the orchestrator on synthetic installers")
+    parser.add_argument('--sizes', default='10,100,1000', help="Comma-separated numbers of stub installers")
+    parser.add_argument('--shape', choices=SHAPES, default='random', help="Dependency graph between the stubs")
+    parser.add_argument('--sleep', type=float, default=0.01, help="Seconds each stub sleeps")
+    parser.add_argument('--output-bytes', type=int, default=1024, help="Bytes of output each stub prints")
+    parser.add_argument('--failure-rate', type=float, default=0.05, help="Fraction of stubs that exit non-zero")
+    parser.add_argument('--probe-rate', type=float, default=0.1, help="Fraction of stubs whose check needs a shell")
+    parser.add_argument('--contention', type=float, default=0.2, help="Fraction of stubs that hold the gsettings lock")
+    parser.add_argument('-j', '--jobs', type=int, default=4, help="Parallel installers")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per size (the median is reported)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--results', type=Path, default=RESULTS_FILE, help="JSON-lines file results are appended to")
+    args = parser.parse_args()
+    
+    # Orchestrator modules resolve ~ at import time, so isolate HOME first
+    results_file = args.results.expanduser()
+    revision = git_revision()
+    workdir = Path(tempfile.mkdtemp(prefix='bentobox-benchmark-'))
+    os.environ['HOME'] = str(workdir / 'home')
+    Path(os.environ['HOME']).mkdir()
+    os.environ.pop('DISPLAY', None)
+    os.environ.pop('WAYLAND_DISPLAY', None)
+    sys.path.insert(0, str(INSTALL_DIR))
+    
+    print(f"🏁 Bentobox orchestrator benchmark ({revision})")
+    print(f"   shape={args.shape} sleep={args.sleep}s output={args.output_bytes}B "
+          f"failures={args.failure_rate:.0%} jobs={args.jobs} repeat={args.repeat}")
+    print(f"   Orchestrator output: {workdir / 'orchestrator.log'} (removed afterwards)")
+    
+    try:
+        for size in [int(s) for s in args.sizes.split(',')]:
+            scenario = {
+                'size': size, 'shape': args.shape, 'sleep': args.sleep,
+                'output_bytes': args.output_bytes, 'failure_rate': args.failure_rate,
+                'probe_rate': args.probe_rate, 'contention': args.contention,
+                'jobs': args.jobs, 'seed': args.seed,
+            }
+            timings = run_scenario(args, size, workdir)
+            baseline = previous_result(results_file, scenario)
+            
+            print(f"\n📦 {size} installers")
+            for phase, seconds in timings.items():
+                line = f"   {phase:<16} {seconds * 1000:>10.2f} ms"
+                if baseline and phase in baseline['timings'] and baseline['timings'][phase]:
+                    change = seconds / baseline['timings'][phase] - 1
+                    line += f"   {change:+.0%} vs {baseline['revision']}"
+                print(line)
+            
+            results_file.parent.mkdir(parents=True, exist_ok=True)
+            with open(results_file, 'a') as f:
+                f.write(json.dumps({
+                    'time': time.time(),
+                    'revision': revision,
+                    'scenario': scenario,
+                    'timings': timings,
+                }) + '\n')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    
+    print(f"\n💾 Results appended to {results_file}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Bentobox Component Logs
+Everything an installer prints is written to its own log file in
+~/.cache/bentobox/logs (<component>.log, with older runs kept as .log.1,
+.log.2, ...), and the last few KB are kept in memory so a failure can be
+explained without reading the file back.
+
+Memory use doesn't depend on how much an installer prints: output goes
+straight to the file, and the in-memory tail is a fixed-size ring buffer.
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import List, Optional
+
+LOG_DIR = Path.home() / '.cache/bentobox/logs'
+DEFAULT_TAIL_BYTES = 4096
+DEFAULT_MAX_LOG_BYTES = 5 * 1024 ** 2
+LOG_BACKUPS = 3  # Older logs kept per component
+
+ANSI_ESCAPE = re.compile(r'\x1b(\[[0-9;?]*[A-Za-z]|\][^\x07]*\x07|[()][A-Z0-9])')
+
+
+class RingBuffer:
+    """The last `capacity` bytes written to it"""
+    
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.buffer = bytearray(capacity)
+        self.position = 0  # Where the next byte goes
+        self.written = 0  # Total bytes ever written
+    
+    def write(self, data: bytes):
+        if len(data) >= self.capacity:
+            self.buffer[:] = data[-self.capacity:]
+            self.position = 0
+        else:
+            end = self.position + len(data)
+            if end <= self.capacity:
+                self.buffer[self.position:end] = data
+            else:
+                split = self.capacity - self.position
+                self.buffer[self.position:] = data[:split]
+                self.buffer[:end - self.capacity] = data[split:]
+            self.position = end % self.capacity
+        self.written += len(data)
+    
+    @property
+    def truncated(self) -> bool:
+        return self.written > self.capacity
+    
+    def getvalue(self) -> bytes:
+        if not self.truncated:
+            return bytes(self.buffer[:self.written])
+        return bytes(self.buffer[self.position:] + self.buffer[:self.position])
+
+
+class ComponentLog:
+    """Log file and in-memory tail for one component's installer output
+    
+    Opening rotates the previous run's log out of the way; a log that
+    grows past max_bytes during a run is rotated too, so each component
+    uses at most max_bytes * (LOG_BACKUPS + 1) of disk.
+    """
+    
+    def __init__(self, name: str, log_dir: Path = LOG_DIR, tail_bytes: int = DEFAULT_TAIL_BYTES,
+                 max_bytes: int = DEFAULT_MAX_LOG_BYTES):
+        self.path = log_dir / f"{name}.log"
+        self.max_bytes = max_bytes
+        self.tail = RingBuffer(tail_bytes)
+        self.file = None
+        self.size = 0
+    
+    def open(self, header: str = '', append: bool = False):
+        """Start a new log, keeping the previous one as a backup, or with
+        append carry on with the current one (a retry in the same run)"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            if append:
+                self.file = open(self.path, 'ab')
+                self.size = self.file.tell()
+            else:
+                self._rotate()
+                self.file = open(self.path, 'wb')
+                self.size = 0
+        except OSError:
+            self.file = None  # Still keep the tail
+        if header:
+            self.mark(header)
+    
+    def mark(self, text: str):
+        """Write a line of our own to the log (not the tail)"""
+        if self.file is not None:
+            self._write_file(f"=== {text} ===\n".encode())
+    
+    def write(self, data: bytes):
+        self.tail.write(data)
+        if self.file is not None:
+            self._write_file(data)
+    
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+    
+    def _write_file(self, data: bytes):
+        try:
+            if self.size + len(data) > self.max_bytes and self.size:
+                self.file.close()
+                self._rotate()
+                self.file = open(self.path, 'wb')
+                self.size = 0
+            self.file.write(data)
+            self.size += len(data)
+        except OSError:
+            self.close()  # Disk full or similar: give up on the file
+    
+    def _rotate(self):
+        names = [str(self.path)] + [f"{self.path}.{index}" for index in range(1, LOG_BACKUPS + 1)]
+        for newer, older in reversed(list(zip(names, names[1:]))):
+            try:
+                os.replace(newer, older)
+            except FileNotFoundError:
+                pass
+    
+    def tail_lines(self) -> List[str]:
+        """The tail as readable lines, without colours or progress redraws"""
+        text = self.tail.getvalue().decode('utf-8', errors='replace')
+        lines = text.split('\n')
+        if self.tail.truncated:
+            lines = lines[1:]  # Probably starts mid-line
+        lines = [ANSI_ESCAPE.sub('', line.rstrip('\r').rsplit('\r', 1)[-1]).rstrip() for line in lines]
+        return [line for line in lines if line]
+    
+    def tail_text(self) -> Optional[str]:
+        return '\n'.join(self.tail_lines()) or None
@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: alacritty --version
 
 # Check if Alacritty should be skipped (already installed)
 if [ "$SKIP_ALACRITTY" = "true" ]; then
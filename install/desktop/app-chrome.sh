@@ -1,4 +1,6 @@
 #!/bin/bash
+# CHECK_COMMAND: google-chrome --version
+# ARTIFACTS: https://dl.google.com/linux/direct/google-chrome-stable_current_amd64.deb
 
 # Check if Chrome should be skipped (already installed)
 if [ "$SKIP_CHROME" = "true" ]; then
@@ -7,8 +9,10 @@ if [ "$SKIP_CHROME" = "true" ]; then
 fi
 
 # Browse the web with the most popular browser. See https://www.google.com/chrome/
+source $OMAKUB_PATH/install/lib/artifacts.sh
+
 cd /tmp
-wget https://dl.google.com/linux/direct/google-chrome-stable_current_amd64.deb
+bentobox_fetch https://dl.google.com/linux/direct/google-chrome-stable_current_amd64.deb google-chrome-stable_current_amd64.deb
 sudo apt install -y ./google-chrome-stable_current_amd64.deb
 rm google-chrome-stable_current_amd64.deb
 xdg-settings set default-web-browser google-chrome.desktop
@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: code --version
 
 # Check if VS Code should be skipped (already installed)
 if [ "$SKIP_VSCODE" = "true" ]; then
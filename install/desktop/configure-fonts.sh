@@ -1,6 +1,9 @@
 #!/bin/bash
 # Configure fonts for GNOME terminal and system
 
+source $OMAKUB_PATH/install/lib/gsettings-batch.sh
+gsettings_batch_begin
+
 # Set monospace font for GNOME Terminal and system
 # CaskaydiaMono Nerd Font with size 11 (good balance)
 gsettings set org.gnome.desktop.interface monospace-font-name 'CaskaydiaMono Nerd Font Mono 11'
@@ -23,6 +26,8 @@ fi
 gsettings set org.gnome.desktop.interface font-name 'Ubuntu 11'
 gsettings set org.gnome.desktop.interface document-font-name 'Ubuntu 11'
 
+gsettings_batch_apply --quiet
+
 echo "✅ Fonts configured:"
 echo "   Monospace: CaskaydiaMono Nerd Font Mono 11"
 echo "   Terminal: CaskaydiaMono Nerd Font Mono 11"
@@ -2,13 +2,15 @@
 
 mkdir -p ~/.local/share/fonts
 
+source $OMAKUB_PATH/install/lib/artifacts.sh
+
 cd /tmp
-wget https://github.com/ryanoasis/nerd-fonts/releases/latest/download/CascadiaMono.zip
+bentobox_fetch https://github.com/ryanoasis/nerd-fonts/releases/latest/download/CascadiaMono.zip CascadiaMono.zip
 unzip CascadiaMono.zip -d CascadiaFont
 cp CascadiaFont/*.ttf ~/.local/share/fonts
 rm -rf CascadiaMono.zip CascadiaFont
 
-wget -O iafonts.zip https://github.com/iaolo/iA-Fonts/archive/refs/heads/master.zip
+bentobox_fetch https://github.com/iaolo/iA-Fonts/archive/refs/heads/master.zip iafonts.zip
 unzip iafonts.zip -d iaFonts
 cp iaFonts/iA-Fonts-master/iA\ Writer\ Mono/Static/iAWriterMonoS-*.ttf ~/.local/share/fonts
 rm -rf iafonts.zip iaFonts
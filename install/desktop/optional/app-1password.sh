@@ -1,8 +1,11 @@
 #!/bin/bash
+# ARTIFACTS: https://downloads.1password.com/linux/debian/amd64/stable/1password-latest.deb
 
 # Install 1password and 1password-cli single script
+source $OMAKUB_PATH/install/lib/artifacts.sh
+
 cd /tmp
-wget https://downloads.1password.com/linux/debian/amd64/stable/1password-latest.deb -O 1password.deb
+bentobox_fetch https://downloads.1password.com/linux/debian/amd64/stable/1password-latest.deb 1password.deb
 sudo apt install ./1password.deb -y
 rm 1password.deb
 cd -
\ No newline at end of file
@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: cursor --version
 
 # Check if Cursor should be skipped (already installed)
 if [ "$SKIP_CURSOR" = "true" ]; then
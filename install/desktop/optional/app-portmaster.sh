@@ -1,4 +1,5 @@
 #!/bin/bash
+# ARTIFACTS: https://updates.safing.io/latest/linux_amd64/packages/portmaster-installer.deb
 
 # Install Portmaster - Application firewall and privacy tool
 # https://safing.io/
@@ -12,8 +13,9 @@ fi
 echo "Installing Portmaster..."
 
 # Download and run installer script
+source $OMAKUB_PATH/install/lib/artifacts.sh
 cd /tmp
-wget -q "https://updates.safing.io/latest/linux_amd64/packages/portmaster-installer.deb" -O portmaster-installer.deb
+bentobox_fetch "https://updates.safing.io/latest/linux_amd64/packages/portmaster-installer.deb" portmaster-installer.deb
 
 if [ -f portmaster-installer.deb ]; then
     sudo apt install -y ./portmaster-installer.deb
@@ -1,4 +1,5 @@
 #!/bin/bash
+# ARTIFACTS: https://www.reaper.fm/files/7.x/reaper_linux_x86_64.tar.xz
 
 # Install REAPER - Digital Audio Workstation (DAW)
 # https://www.reaper.fm/
@@ -12,8 +13,9 @@ fi
 echo "Installing REAPER..."
 
 # Download latest Linux version
+source $OMAKUB_PATH/install/lib/artifacts.sh
 cd /tmp
-wget -q "https://www.reaper.fm/files/7.x/reaper_linux_x86_64.tar.xz" -O reaper.tar.xz
+bentobox_fetch "https://www.reaper.fm/files/7.x/reaper_linux_x86_64.tar.xz" reaper.tar.xz
 
 if [ -f reaper.tar.xz ]; then
     # Extract and install
@@ -1,4 +1,5 @@
 #!/bin/bash
+# REQUIRES: docker
 # WinBoat - Run Windows Apps on Linux ("Reverse WSL")
 # BETA software - Advanced users only
 
@@ -1,4 +1,5 @@
 #!/bin/bash
+# ESTIMATED_TIME: 15m
 # Download Windows 10 ISO for WinBoat
 # Windows 10 22H2 is recommended (more stable than Windows 11 in VMs)
 
@@ -1,5 +1,9 @@
 #!/bin/bash
 
+# Collect every key below and write only what changed, in one go
+source $OMAKUB_PATH/install/lib/gsettings-batch.sh
+gsettings_batch_begin
+
 # Center new windows in the middle of the screen
 gsettings set org.gnome.mutter center-new-windows true
 
@@ -11,3 +15,5 @@ gsettings set org.gnome.desktop.calendar show-weekdate true
 
 # Turn off ambient sensors for setting screen brightness (they rarely work well!)
 gsettings set org.gnome.settings-daemon.plugins.power ambient-enabled false
+
+gsettings_batch_apply --quiet
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Bentobox Component Detection
+Decides whether components are already installed, using cheap lookups first
+and only falling back to running check commands when those are inconclusive.
+"""
+
+import os
+import json
+import shlex
+import shutil
+import hashlib
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set
+
+DPKG_STATUS = Path('/var/lib/dpkg/status')
+CACHE_FILE = Path.home() / '.cache/bentobox/detection.json'
+
+# Change whenever packages, flatpaks or snaps are installed or removed
+PACKAGE_STATE_PATHS = [
+    DPKG_STATUS,
+    Path('/var/lib/flatpak/app'),
+    Path.home() / '.local/share/flatpak/app',
+    Path('/var/lib/snapd/snaps'),
+]
+
+# Where system, user, flatpak and snap launchers are installed
+DESKTOP_DIRS = [
+    Path('/usr/share/applications'),
+    Path('/usr/local/share/applications'),
+    Path.home() / '.local/share/applications',
+    Path('/var/lib/flatpak/exports/share/applications'),
+    Path.home() / '.local/share/flatpak/exports/share/applications',
+    Path('/var/lib/snapd/desktop/applications'),
+]
+
+# Anything beyond "binary --flag" needs a real shell to evaluate
+SHELL_CHARACTERS = set('|&;<>()$`\\"\'*?[]{}~=')
+
+
+@dataclass
+class DetectionSpec:
+    """What to look for when deciding if a component is installed"""
+    name: str
+    check_command: Optional[str] = None
+    packages: List[str] = field(default_factory=list)  # dpkg packages
+    desktop_files: List[str] = field(default_factory=list)  # launcher file names
+
+
+class DetectionEngine:
+    """Tiered installed-component detection
+    
+    1. shutil.which() on the check command's binary
+    2. dpkg status database lookup
+    3. .desktop launcher lookup (covers flatpak and snap apps)
+    4. Running the check command, only when the tiers above can't decide,
+       on a bounded thread pool
+    
+    Results are cached on disk together with a fingerprint of everything
+    they depend on (the resolved binary, the dpkg database, flatpak and
+    snap install dirs), so unchanged components are answered without
+    detecting them again.
+    """
+    
+    def __init__(self, max_probes: int = 4, probe_timeout: int = 5,
+                 cache_file: Optional[Path] = CACHE_FILE):
+        self.max_probes = max_probes
+        self.probe_timeout = probe_timeout
+        self.cache_file = cache_file
+        self.cache_hits = 0
+        self._installed_packages: Optional[Set[str]] = None
+        self._stats: Dict[str, Optional[List[int]]] = {}
+    
+    def detect_all(self, specs: List[DetectionSpec]) -> Dict[str, bool]:
+        """Detect every spec, returning component name → installed"""
+        cache = self._load_cache()
+        fingerprints = {}
+        results = {}
+        probes = []
+        self.cache_hits = 0
+        self._stats = {}
+        
+        for spec in specs:
+            fingerprints[spec.name] = self.fingerprint(spec)
+            entry = cache.get(spec.name)
+            if entry and entry.get('fingerprint') == fingerprints[spec.name]:
+                results[spec.name] = entry['installed']
+                self.cache_hits += 1
+                continue
+            
+            verdict = self.detect_cheap(spec)
+            if verdict is None:
+                probes.append(spec)
+            else:
+                results[spec.name] = verdict
+        
+        if probes:
+            with ThreadPoolExecutor(max_workers=self.max_probes) as pool:
+                for spec, installed in zip(probes, pool.map(self.probe, probes)):
+                    results[spec.name] = installed
+        
+        if self.cache_hits < len(specs):
+            for spec in specs:
+                cache[spec.name] = {
+                    'fingerprint': fingerprints[spec.name],
+                    'installed': results[spec.name],
+                }
+            self._save_cache(cache)
+        
+        return results
+    
+    def fingerprint(self, spec: DetectionSpec) -> str:
+        """Hash of everything a detection result depends on"""
+        binary, _ = self._parse_check_command(spec.check_command)
+        parts = [spec.check_command, spec.packages, spec.desktop_files]
+        
+        if binary:
+            path = shutil.which(binary)
+            if path:
+                parts.append([os.path.realpath(path), self._stat(os.path.realpath(path))])
+            else:
+                # A missing binary shows up by changing its directory's mtime
+                path_dirs = os.environ.get('PATH', '').split(os.pathsep)
+                parts.append([self._stat(d) for d in path_dirs])
+        
+        parts.append([self._stat(str(p)) for p in PACKAGE_STATE_PATHS])
+        if spec.desktop_files:
+            parts.append([self._stat(str(d)) for d in DESKTOP_DIRS])
+        
+        return hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+    
+    def detect_cheap(self, spec: DetectionSpec) -> Optional[bool]:
+        """Decide without spawning anything, or return None if a probe is needed"""
+        binary, simple = self._parse_check_command(spec.check_command)
+        
+        if binary and shutil.which(binary):
+            # "tool --version" can't tell us more than finding the tool did
+            return True if simple else None
+        
+        if spec.packages and all(p in self.installed_packages() for p in spec.packages):
+            return True
+        
+        if spec.desktop_files and any(self._desktop_file_exists(f) for f in spec.desktop_files):
+            return True
+        
+        if spec.check_command and not simple:
+            return None
+        
+        # Either the check binary is missing, or there is nothing to check
+        return False
+    
+    def probe(self, spec: DetectionSpec) -> bool:
+        """Run the component's check command"""
+        _, simple = self._parse_check_command(spec.check_command)
+        try:
+            result = subprocess.run(
+                shlex.split(spec.check_command) if simple else spec.check_command,
+                shell=not simple,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                timeout=self.probe_timeout
+            )
+            return result.returncode == 0
+        except Exception:
+            return False
+    
+    def installed_packages(self) -> Set[str]:
+        """Installed package names from the dpkg status database (read once)"""
+        if self._installed_packages is None:
+            self._installed_packages = read_dpkg_status()
+        return self._installed_packages
+    
+    def _parse_check_command(self, command: Optional[str]):
+        """Return (binary, simple) for a check command"""
+        if not command or not command.strip():
+            return None, False
+        simple = not (set(command) & SHELL_CHARACTERS)
+        return command.split()[0], simple
+    
+    def _desktop_file_exists(self, name: str) -> bool:
+        return any((directory / name).exists() for directory in DESKTOP_DIRS)
+    
+    def _stat(self, path: str) -> Optional[List[int]]:
+        """(mtime, inode) of a path, memoised for one detection pass"""
+        if path not in self._stats:
+            try:
+                st = os.stat(path)
+                self._stats[path] = [st.st_mtime_ns, st.st_ino]
+            except OSError:
+                self._stats[path] = None
+        return self._stats[path]
+    
+    def _load_cache(self) -> Dict[str, dict]:
+        if not self.cache_file or not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self, cache: Dict[str, dict]):
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix('.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(cache, f)
+            os.replace(tmp_file, self.cache_file)
+        except OSError:
+            pass
+
+
+def read_dpkg_status(status_file: Path = DPKG_STATUS) -> Set[str]:
+    """Read installed package names from a dpkg status file"""
+    installed = set()
+    try:
+        with open(status_file) as f:
+            package = None
+            for line in f:
+                if line.startswith('Package: '):
+                    package = line[9:].strip()
+                elif line.startswith('Status: ') and line.rstrip().endswith(' installed') and package:
+                    installed.add(package)
+    except OSError:
+        pass
+    return installed
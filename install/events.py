@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Bentobox Progress Events
+Machine-readable progress from the orchestrator: one JSON object per line,
+written to a file descriptor or Unix socket provided by whoever started it.
+
+Every event has `event`, `seq` and `time` fields. Events emitted by the
+orchestrator:
+
+    run_started         components, queue, jobs
+    phase               name
+    component_started   component
+    component_status    component, status, error
+    component_finished  component, status, error, failure, metrics
+    component_retry     component, attempt, delay, failure
+    log                 component, data
+    concurrency         jobs, reason (the parallel job limit changed)
+    cancelling          signal (Ctrl+C/SIGTERM while installing)
+    run_finished        success, failed, skipped, cancelled, duration
+    plan                steps, predicted, jobs (--plan only, instead of the above)
+    dropped             count (events lost because the reader fell behind)
+"""
+
+import os
+import json
+import time
+import queue
+import socket
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+# Log chunks are dropped first so status events still get through
+LOG_EVENTS = {'log'}
+
+
+class EventStream:
+    """Non-blocking JSON-lines event writer
+    
+    emit() only puts the event on a bounded queue; a background thread does
+    the writing. If the reader can't keep up the queue fills and events are
+    dropped (log chunks first) instead of stalling installs, and a
+    `dropped` event tells the reader how many it missed.
+    """
+    
+    def __init__(self, fd: Optional[int] = None, sock: Optional[socket.socket] = None,
+                 max_queue: int = 1024):
+        self._fd = fd
+        self._sock = sock
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._log_limit = max_queue * 3 // 4
+        self._seq = 0
+        self._dropped = 0
+        self._broken = False
+        self._lock = threading.Lock()
+        self._thread = None
+        
+        if self.enabled:
+            self._thread = threading.Thread(target=self._writer, name='bentobox-events', daemon=True)
+            self._thread.start()
+    
+    @classmethod
+    def open(cls, fd: Optional[int] = None, socket_path: Optional[str] = None) -> 'EventStream':
+        """Stream to an inherited fd or a listening Unix socket (disabled if neither)"""
+        if socket_path:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(socket_path)
+            return cls(sock=sock)
+        if fd is not None:
+            os.set_inheritable(fd, False)  # Installers must not hold the stream open
+            return cls(fd=fd)
+        return cls()
+    
+    @property
+    def enabled(self) -> bool:
+        return (self._fd is not None or self._sock is not None) and not self._broken
+    
+    def emit(self, event: str, **fields):
+        """Queue an event without ever blocking the caller"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._seq += 1
+            record = {'event': event, 'seq': self._seq, 'time': time.time(), **fields}
+            if event in LOG_EVENTS and self._queue.qsize() >= self._log_limit:
+                self._dropped += 1
+                return
+            try:
+                self._queue.put_nowait(record)
+            except queue.Full:
+                self._dropped += 1
+    
+    def close(self, timeout: float = 2.0):
+        """Flush what the reader will take within timeout, then close"""
+        if self._thread is None:
+            return
+        if not self._broken:
+            try:
+                self._queue.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self._thread = None
+        if self._sock is not None:
+            self._sock.close()
+        elif self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+    
+    def _writer(self):
+        while True:
+            record = self._queue.get()
+            if record is None:
+                return
+            
+            with self._lock:
+                dropped, self._dropped = self._dropped, 0
+            lines = []
+            if dropped:
+                lines.append({'event': 'dropped', 'seq': record['seq'], 'time': time.time(), 'count': dropped})
+            lines.append(record)
+            
+            try:
+                self._write(''.join(json.dumps(line, default=str) + '\n' for line in lines).encode())
+            except OSError:
+                # Reader went away; from now on emit() does nothing
+                self._broken = True
+                return
+    
+    def _write(self, data: bytes):
+        if self._sock is not None:
+            self._sock.sendall(data)
+            return
+        while data:
+            written = os.write(self._fd, data)
+            data = data[written:]
+
+
+class EventListener:
+    """Reader side: listens on a Unix socket and hands each event to a callback
+    
+    Start it before launching the orchestrator with --events-socket PATH.
+    The callback runs on the listener's own thread.
+    """
+    
+    def __init__(self, path: Path, on_event: Callable[[dict], None]):
+        self.path = Path(path)
+        self.on_event = on_event
+        
+        self.path.unlink(missing_ok=True)
+        self._server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._server.bind(str(self.path))
+        self._server.listen(1)
+        self._thread = threading.Thread(target=self._serve, name='bentobox-event-listener', daemon=True)
+    
+    def start(self) -> 'EventListener':
+        self._thread.start()
+        return self
+    
+    def close(self):
+        try:
+            self._server.close()
+        finally:
+            self.path.unlink(missing_ok=True)
+    
+    def _serve(self):
+        try:
+            connection, _ = self._server.accept()
+        except OSError:
+            return
+        with connection, connection.makefile('r', encoding='utf-8', errors='replace') as stream:
+            for line in stream:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    continue
+                self.on_event(event)
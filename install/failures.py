@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Bentobox Failure Classification
+Works out why an installer failed from its exit code and the last lines it
+printed, so transient failures (a flaky mirror, apt still holding the dpkg
+lock) can be retried while real problems are reported straight away.
+"""
+
+import re
+from enum import Enum
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+
+class FailureKind(Enum):
+    NETWORK = "network"  # DNS, refused/reset connections, mirror errors
+    DPKG_LOCK = "dpkg_lock"  # Another apt/dpkg held the lock
+    MISSING_DEPENDENCY = "missing_dependency"  # Command or package not available
+    SUDO = "sudo"  # sudo wanted a password and couldn't ask for one
+    SCRIPT_ERROR = "script_error"  # Anything else: treated as a bug in the script
+    TIMEOUT = "timeout"  # Stopped by the watchdog
+
+
+# Failures worth trying again after a pause
+TRANSIENT = {FailureKind.NETWORK, FailureKind.DPKG_LOCK}
+
+# Checked in this order; the first kind with a matching line wins
+PATTERNS = [
+    (FailureKind.SUDO, re.compile(
+        r'sudo: (a password is required|a terminal is required|no tty present)',
+        re.IGNORECASE)),
+    (FailureKind.DPKG_LOCK, re.compile(
+        r'could not get lock /var/lib/(dpkg|apt)|unable to acquire the dpkg frontend lock'
+        r'|unable to lock (the )?(administration|download) directory|is another process using it',
+        re.IGNORECASE)),
+    (FailureKind.NETWORK, re.compile(
+        r'temporary failure (in name resolution|resolving)|could not resolve host|name or service not known'
+        r'|failed to fetch|connection (timed out|refused|reset)|network is unreachable|no route to host'
+        r'|unable to connect to|operation timed out|tls handshake|gnutls_handshake|ssl_connect|ssl_error'
+        r'|\b(50[234]) (bad gateway|service unavailable|gateway time-?out)|hash sum mismatch'
+        r'|the remote end hung up unexpectedly|early eof|curl: \((6|7|18|28|35|52|56)\)'
+        r'|read error at byte|unable to establish ssl connection',
+        re.IGNORECASE)),
+    (FailureKind.MISSING_DEPENDENCY, re.compile(
+        r'command not found|unable to locate package|has no installation candidate|unmet dependencies'
+        r'|but it is not (going to be )?installed|error while loading shared libraries'
+        r'|no module named|modulenotfounderror',
+        re.IGNORECASE)),
+]
+
+# bash: 126 = found but not executable, 127 = command not found
+MISSING_COMMAND_EXIT_CODES = {126, 127}
+
+
+@dataclass
+class Failure:
+    kind: FailureKind
+    evidence: str = ''  # The output line that decided it
+    
+    @property
+    def transient(self) -> bool:
+        return self.kind in TRANSIENT
+    
+    def describe(self) -> str:
+        label = self.kind.value.replace('_', ' ')
+        return f"{label}: {self.evidence}" if self.evidence else label
+
+
+def classify(returncode: Optional[int], tail: Iterable[str]) -> Failure:
+    """Classify a failed run from its exit code and last output lines"""
+    lines = [line.strip() for line in tail if line.strip()]
+    for kind, pattern in PATTERNS:
+        # Latest lines first: the error is usually near the end
+        for line in reversed(lines):
+            if pattern.search(line):
+                return Failure(kind, _shorten(line))
+    if returncode in MISSING_COMMAND_EXIT_CODES:
+        return Failure(FailureKind.MISSING_DEPENDENCY, f"exit code {returncode}")
+    return Failure(FailureKind.SCRIPT_ERROR, _shorten(lines[-1]) if lines else '')
+
+
+def _shorten(line: str, limit: int = 120) -> str:
+    line = re.sub(r'\x1b\[[0-9;?]*[A-Za-z]', '', line)  # Colour codes
+    return line if len(line) <= limit else line[:limit - 1] + '…'
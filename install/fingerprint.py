@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Bentobox Component Fingerprints
+Make-style change detection for installers: a component is rebuilt only
+when one of its inputs (script, sourced helpers, config, distro) changes.
+"""
+
+import re
+import json
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+# `source file` or `. file`, ignoring anything after the path
+SOURCE_PATTERN = re.compile(r'^\s*(?:source|\.)\s+["\']?([^\s"\';|&)]+)', re.MULTILINE)
+
+
+class FingerprintBuilder:
+    """Collects and hashes everything an installer's result depends on
+    
+    Inputs are kept as a flat name → hash mapping, for example:
+        
+        {
+            'script': '3f2a…',
+            'source:install/lib/utils.sh': '9c1d…',
+            'config:languages': '77be…',
+            'distro': 'ubuntu 24.04',
+        }
+    
+    so that besides the overall digest, the orchestrator can tell which
+    inputs changed since the last successful install.
+    """
+    
+    def __init__(self, omakub_path: Path, config: dict, distro: str, plugin: Optional[str] = None):
+        self.omakub_path = Path(omakub_path)
+        self.config = config or {}
+        self.distro = distro
+        self.plugin = plugin
+        self._file_hashes: Dict[Path, str] = {}
+    
+    def inputs(self, script: Path, config_keys: List[str]) -> Dict[str, str]:
+        """Return every input of an installer with its current hash"""
+        script = Path(script)
+        inputs = {'script': self._hash_file(script)}
+        
+        for helper in sorted(self.sourced_files(script)):
+            inputs[f'source:{self._relative(helper)}'] = self._hash_file(helper)
+        
+        for key in config_keys:
+            value = json.dumps(self._config_value(key), sort_keys=True, default=str)
+            inputs[f'config:{key}'] = hashlib.sha256(value.encode()).hexdigest()
+        
+        inputs['distro'] = self.distro
+        return inputs
+    
+    @staticmethod
+    def digest(inputs: Dict[str, str]) -> str:
+        """Single fingerprint for a set of inputs"""
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode()).hexdigest()
+    
+    @staticmethod
+    def changed(previous: Dict[str, str], current: Dict[str, str]) -> List[str]:
+        """Names of inputs that were added, removed or modified"""
+        return sorted(
+            name for name in set(previous) | set(current)
+            if previous.get(name) != current.get(name)
+        )
+    
+    def sourced_files(self, script: Path, seen: Optional[Set[Path]] = None) -> Set[Path]:
+        """Files inside the Bentobox tree that a script sources, recursively"""
+        seen = set() if seen is None else seen
+        try:
+            content = script.read_text(errors='replace')
+        except OSError:
+            return seen
+        
+        code = re.sub(r'^\s*#.*$', '', content, flags=re.MULTILINE)
+        for match in SOURCE_PATTERN.finditer(code):
+            path = self._resolve(match.group(1))
+            if path is None or path in seen or not path.is_file():
+                continue
+            seen.add(path)
+            self.sourced_files(path, seen)
+            
+            # The distro manager loads its plugin by name at runtime
+            if path.name == 'distro-manager.sh' and self.plugin:
+                for plugin in ('base', self.plugin):
+                    plugin_file = self.omakub_path / f'install/distros/{plugin}.sh'
+                    if plugin_file.is_file() and plugin_file not in seen:
+                        seen.add(plugin_file)
+                        self.sourced_files(plugin_file, seen)
+        
+        return seen
+    
+    def _resolve(self, raw: str) -> Optional[Path]:
+        """Expand the variables installers use in source paths"""
+        replacements = {
+            '$OMAKUB_PATH': str(self.omakub_path),
+            '${OMAKUB_PATH}': str(self.omakub_path),
+            '$BENTOBOX_LIB_DIR': str(self.omakub_path / 'install/lib'),
+            '$BENTOBOX_DISTROS_DIR': str(self.omakub_path / 'install/distros'),
+            '~/.local/share/omakub': str(self.omakub_path),
+        }
+        for variable, value in replacements.items():
+            raw = raw.replace(variable, value)
+        if '$' in raw or not raw.startswith('/'):
+            return None
+        
+        path = Path(raw)
+        try:
+            path.relative_to(self.omakub_path)
+        except ValueError:
+            return None  # Only files that ship with Bentobox are tracked
+        return path
+    
+    def _hash_file(self, path: Path) -> str:
+        if path not in self._file_hashes:
+            try:
+                self._file_hashes[path] = hashlib.sha256(path.read_bytes()).hexdigest()
+            except OSError:
+                self._file_hashes[path] = ''
+        return self._file_hashes[path]
+    
+    def _relative(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(self.omakub_path))
+        except ValueError:
+            return str(path)
+    
+    def _config_value(self, key: str):
+        value = self.config
+        for part in key.split('.'):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Bentobox Concurrency Governor
+Decides how many installers may run at once from what the machine is doing:
+load average per CPU, available memory, time spent waiting on disk I/O and
+network throughput, all read from /proc. The limit moves one step at a time
+between min_parallel and max_parallel, and every change is logged with
+the sample behind it to ~/.cache/bentobox/governor.jsonl for tuning.
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+from dataclasses import dataclass, asdict
+from typing import Callable, Optional, Tuple
+
+GOVERNOR_LOG = Path.home() / '.cache/bentobox/governor.jsonl'
+GOVERNOR_LOG_MAX_BYTES = 1024 ** 2  # Then moved to governor.jsonl.1, replacing the one before
+
+SAMPLE_INTERVAL = 2.0  # Seconds between samples
+COOLDOWN = 6.0  # Seconds after a change before the next one; loadavg lags
+JOB_MEMORY_MB = 512  # What one installer is assumed to need when starting out
+
+# Thresholds: above the first of each pair the limit goes down, below the
+# second it may go up
+LOAD_PER_CPU = (1.5, 0.8)
+IOWAIT = (0.30, 0.10)  # Fraction of CPU time
+MEMORY_AVAILABLE = (0.10, 0.25)  # Fraction of total memory
+MIN_MEMORY_MB = 512  # Always lower below this much available
+NETWORK_SATURATED = 0.8  # Of the highest throughput seen, when that's over 1 MB/s
+
+
+@dataclass
+class SystemSample:
+    load_per_cpu: float
+    memory_available: float  # Fraction of MemTotal
+    memory_available_mb: int
+    iowait: float  # Fraction of CPU time since the previous sample
+    network_bps: float  # Bytes per second received and sent, since the previous sample
+
+
+class SystemMonitor:
+    """Reads load, memory, iowait and network counters from /proc"""
+    
+    def __init__(self, proc: Path = Path('/proc')):
+        self.proc = proc
+        self.cpus = os.cpu_count() or 1
+        self._last_cpu: Optional[Tuple[int, int]] = None
+        self._last_net: Optional[Tuple[float, int]] = None
+    
+    def sample(self) -> SystemSample:
+        try:
+            load = os.getloadavg()[0]
+        except OSError:
+            load = 0.0
+        total_kb, available_kb = self._memory()
+        return SystemSample(
+            load_per_cpu=round(load / self.cpus, 2),
+            memory_available=round(available_kb / total_kb, 3) if total_kb else 1.0,
+            memory_available_mb=available_kb // 1024,
+            iowait=round(self._iowait(), 3),
+            network_bps=round(self._network()),
+        )
+    
+    def _memory(self) -> Tuple[int, int]:
+        info = {}
+        try:
+            with open(self.proc / 'meminfo') as f:
+                for line in f:
+                    key, _, value = line.partition(':')
+                    if key in ('MemTotal', 'MemAvailable'):
+                        info[key] = int(value.split()[0])
+        except (OSError, ValueError):
+            pass
+        return info.get('MemTotal', 0), info.get('MemAvailable', info.get('MemTotal', 0))
+    
+    def _iowait(self) -> float:
+        try:
+            with open(self.proc / 'stat') as f:
+                fields = [int(v) for v in f.readline().split()[1:]]
+        except (OSError, ValueError):
+            return 0.0
+        # user nice system idle iowait irq softirq steal (guest time is in user)
+        current = (sum(fields[:8]), fields[4] if len(fields) > 4 else 0)
+        last, self._last_cpu = self._last_cpu, current
+        if last is None or current[0] <= last[0]:
+            return 0.0
+        return (current[1] - last[1]) / (current[0] - last[0])
+    
+    def _network(self) -> float:
+        total = 0
+        try:
+            with open(self.proc / 'net/dev') as f:
+                for line in f.readlines()[2:]:
+                    name, _, counters = line.partition(':')
+                    if name.strip() == 'lo':
+                        continue
+                    values = counters.split()
+                    total += int(values[0]) + int(values[8])  # Received, transmitted bytes
+        except (OSError, ValueError, IndexError):
+            return 0.0
+        now = time.monotonic()
+        last, self._last_net = self._last_net, (now, total)
+        if last is None or now <= last[0]:
+            return 0.0
+        return max(0, total - last[1]) / (now - last[0])
+
+
+def initial_limit(min_jobs: int, max_jobs: int, cpus: int, sample: SystemSample) -> int:
+    """Where the limit starts: as many jobs as the CPUs and available memory allow"""
+    by_memory = sample.memory_available_mb // JOB_MEMORY_MB if sample.memory_available_mb else max_jobs
+    return max(min_jobs, min(max_jobs, cpus, by_memory))
+
+
+class ConcurrencyGovernor:
+    """How many installers may run right now, between min_jobs and max_jobs
+    
+    The scheduler calls update() whenever it looks for work to start; a new
+    sample is taken at most every SAMPLE_INTERVAL seconds. The limit goes
+    down when the machine is short of memory, waiting on disk or overloaded,
+    and up when it has room to spare and every slot is in use.
+    """
+    
+    def __init__(self, min_jobs: int, max_jobs: int, monitor: Optional[SystemMonitor] = None,
+                 log_file: Optional[Path] = GOVERNOR_LOG,
+                 on_change: Optional[Callable[[int, int, str, SystemSample], None]] = None):
+        self.min_jobs = max(1, min_jobs)
+        self.max_jobs = max(self.min_jobs, max_jobs)
+        self.monitor = monitor or SystemMonitor()
+        self.log_file = log_file
+        self.on_change = on_change
+        self.peak_network_bps = 0.0
+        self._next_sample = 0.0
+        self._last_change = 0.0
+        
+        # Start where memory and CPUs allow, and adjust from there
+        sample = self.monitor.sample()
+        self.limit = initial_limit(self.min_jobs, self.max_jobs, self.monitor.cpus, sample)
+        self._log(None, self.limit, 'start', sample)
+    
+    def update(self, running: int, waiting: bool) -> int:
+        """The current limit, re-evaluated if a sample is due
+        
+        running is how many installers are running (for the log), waiting
+        whether any were ready to start but held back by the limit.
+        """
+        now = time.monotonic()
+        if now < self._next_sample:
+            return self.limit
+        self._next_sample = now + SAMPLE_INTERVAL
+        
+        sample = self.monitor.sample()
+        self.peak_network_bps = max(self.peak_network_bps, sample.network_bps)
+        if now - self._last_change < COOLDOWN:
+            return self.limit
+        
+        step, reason = self.decide(sample, waiting)
+        limit = max(self.min_jobs, min(self.max_jobs, self.limit + step))
+        if limit != self.limit:
+            self._log(self.limit, limit, reason, sample, running=running)
+            if self.on_change:
+                self.on_change(self.limit, limit, reason, sample)
+            self.limit = limit
+            self._last_change = now
+        return self.limit
+    
+    def decide(self, sample: SystemSample, waiting: bool) -> Tuple[int, str]:
+        """(-1, 0 or +1, why)"""
+        if sample.memory_available < MEMORY_AVAILABLE[0] or sample.memory_available_mb < MIN_MEMORY_MB:
+            return -1, f"memory low ({sample.memory_available_mb} MB available)"
+        if sample.iowait > IOWAIT[0]:
+            return -1, f"disk busy ({sample.iowait:.0%} iowait)"
+        if sample.load_per_cpu > LOAD_PER_CPU[0]:
+            return -1, f"overloaded (load {sample.load_per_cpu:.2f} per CPU)"
+        
+        if not waiting:
+            return 0, "no work held back"
+        if self.peak_network_bps > 1024 ** 2 and sample.network_bps > NETWORK_SATURATED * self.peak_network_bps:
+            return 0, "network saturated"
+        if (sample.memory_available > MEMORY_AVAILABLE[1] and sample.iowait < IOWAIT[1]
+                and sample.load_per_cpu < LOAD_PER_CPU[1]):
+            return 1, f"headroom (load {sample.load_per_cpu:.2f} per CPU, {sample.memory_available:.0%} memory free)"
+        return 0, "steady"
+    
+    def _log(self, previous: Optional[int], limit: int, reason: str, sample: SystemSample, running: int = 0):
+        if self.log_file is None:
+            return
+        record = {'time': time.time(), 'from': previous, 'to': limit, 'reason': reason, 'running': running,
+                  **asdict(sample)}
+        try:
+            self.log_file.parent.mkdir(parents=True, exist_ok=True)
+            if self.log_file.exists() and self.log_file.stat().st_size >= GOVERNOR_LOG_MAX_BYTES:
+                os.replace(self.log_file, f"{self.log_file}.1")
+            with open(self.log_file, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+        except OSError:
+            pass  # Only for tuning
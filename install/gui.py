@@ -12,7 +12,6 @@ from gi.repository import Gtk, GLib, Vte, Pango, Gdk, GdkPixbuf
 
 import os
 import sys
-import json
 import yaml
 import subprocess
 import threading
@@ -22,6 +21,10 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from PIL import Image
 
+from state_store import StateStore
+from events import EventListener
+from post_install import PostInstallPipeline, POST_INSTALL_STEPS, WALLPAPER_STEP
+
 class BentoboxGUI:
     def __init__(self):
         self.home = Path.home()
@@ -36,6 +39,13 @@ class BentoboxGUI:
         self.selected_containers = set()
         self.selected_theme = 'tokyo-night'
         
+        # Progress of a running installation (from orchestrator events)
+        self.install_events = None
+        self.install_active = False  # Until its completion has been handled, once
+        self.install_total = 0
+        self.install_done = 0
+        self.install_running = []
+        
         # Apply styling before building UI
         self.apply_styling()
         
@@ -54,11 +64,8 @@ class BentoboxGUI:
         }
     
     def load_state(self) -> dict:
-        """Load installation state"""
-        if self.state_file.exists():
-            with open(self.state_file) as f:
-                return json.load(f)
-        return {}
+        """Load installation state, including changes still in the journal"""
+        return StateStore(self.state_file).load()
     
     def apply_styling(self):
         """Apply custom CSS styling to the application"""
@@ -967,6 +974,12 @@ class BentoboxGUI:
         self.install_info_label.set_halign(Gtk.Align.START)
         box.pack_start(self.install_info_label, False, False, 0)
         
+        # Overall progress, driven by the orchestrator's event stream
+        self.install_progress = Gtk.ProgressBar()
+        self.install_progress.set_show_text(True)
+        self.install_progress.set_no_show_all(True)
+        box.pack_start(self.install_progress, False, False, 0)
+        
         # Terminal widget
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_policy(Gtk.PolicyType.AUTOMATIC, Gtk.PolicyType.AUTOMATIC)
@@ -984,6 +997,7 @@ class BentoboxGUI:
         self.terminal.set_size(80, 24)
         
         scrolled.add(self.terminal)
+        self.terminal.connect("child-exited", self.on_install_exited)
         
         return box
     
@@ -1388,7 +1402,12 @@ class BentoboxGUI:
         try:
             fonts_script = self.omakub_path / 'install/desktop/fonts.sh'
             if fonts_script.exists():
-                subprocess.run(['bash', str(fonts_script)], timeout=300, check=True)
+                subprocess.run(
+                    ['bash', str(fonts_script)],
+                    env={**os.environ, 'OMAKUB_PATH': str(self.omakub_path)},
+                    timeout=300,
+                    check=True
+                )
             
             GLib.idle_add(self.on_fonts_complete)
         except Exception as e:
@@ -1615,85 +1634,14 @@ class BentoboxGUI:
             env = os.environ.copy()
             env['G_MESSAGES_DEBUG'] = ''
             
-            # Install fonts
-            GLib.idle_add(self.append_to_terminal, "📝 Installing fonts...\n")
-            fonts_script = self.omakub_path / 'install/desktop/fonts.sh'
-            if fonts_script.exists():
-                result = subprocess.run(
-                    ['bash', str(fonts_script)],
-                    capture_output=True,
-                    text=True,
-                    timeout=300,
-                    env=env
-                )
-                GLib.idle_add(self.append_to_terminal, result.stdout)
-                if result.stderr:
-                    GLib.idle_add(self.append_to_terminal, result.stderr)
-                GLib.idle_add(self.append_to_terminal, "✅ Fonts installed\n\n")
-            
-            # Configure fonts
-            GLib.idle_add(self.append_to_terminal, "⚙️  Configuring terminal fonts...\n")
-            configure_script = self.omakub_path / 'install/desktop/configure-fonts.sh'
-            if configure_script.exists():
-                result = subprocess.run(
-                    ['bash', str(configure_script)],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                    env=env
-                )
-                GLib.idle_add(self.append_to_terminal, result.stdout)
-                if result.stderr:
-                    GLib.idle_add(self.append_to_terminal, result.stderr)
-                GLib.idle_add(self.append_to_terminal, "✅ Font configuration complete\n\n")
-            
-            # Apply theme
-            GLib.idle_add(self.append_to_terminal, "🎨 Applying GNOME theme...\n")
-            theme_script = self.omakub_path / 'install/desktop/set-gnome-theme.sh'
-            if theme_script.exists():
-                result = subprocess.run(
-                    ['bash', str(theme_script)],
-                    env={**env, 'OMAKUB_PATH': str(self.omakub_path)},
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                GLib.idle_add(self.append_to_terminal, result.stdout)
-                if result.stderr:
-                    GLib.idle_add(self.append_to_terminal, result.stderr)
-                GLib.idle_add(self.append_to_terminal, "✅ Theme applied\n\n")
-            
-            # Apply settings
-            GLib.idle_add(self.append_to_terminal, "⚙️  Applying GNOME settings...\n")
-            settings_script = self.omakub_path / 'install/desktop/set-gnome-settings.sh'
-            if settings_script.exists():
-                result = subprocess.run(
-                    ['bash', str(settings_script)],
-                    capture_output=True,
-                    text=True,
-                    timeout=60,
-                    env=env
-                )
-                GLib.idle_add(self.append_to_terminal, result.stdout)
-                if result.stderr:
-                    GLib.idle_add(self.append_to_terminal, result.stderr)
-                GLib.idle_add(self.append_to_terminal, "✅ GNOME settings applied\n\n")
-            
-            # Set wallpaper
-            GLib.idle_add(self.append_to_terminal, "🖼️  Setting wallpaper...\n")
-            wallpaper_script = self.omakub_path / 'install/desktop/set-wallpaper.sh'
-            if wallpaper_script.exists():
-                result = subprocess.run(
-                    ['bash', str(wallpaper_script)],
-                    env={**env, 'OMAKUB_PATH': str(self.omakub_path)},
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                GLib.idle_add(self.append_to_terminal, result.stdout)
-                if result.stderr:
-                    GLib.idle_add(self.append_to_terminal, result.stderr)
-                GLib.idle_add(self.append_to_terminal, "✅ Wallpaper set\n\n")
+            # Fonts download while the theme and settings are applied
+            PostInstallPipeline(
+                self.omakub_path,
+                {**env, 'OMAKUB_PATH': str(self.omakub_path)},
+                steps=POST_INSTALL_STEPS + [WALLPAPER_STEP],
+                log=lambda text: GLib.idle_add(self.append_to_terminal, text),
+                capture=True
+            ).run()
             
             GLib.idle_add(self.append_to_terminal, "\n🎉 All customizations applied!\n")
             GLib.idle_add(self.append_to_terminal, "=" * 50 + "\n")
@@ -1954,6 +1902,7 @@ class BentoboxGUI:
         # Disable install button
         self.install_btn.set_sensitive(False)
         self.install_btn.set_label("⏳ Installing...")
+        self.install_active = True
         
         # Run installation in thread
         thread = threading.Thread(target=self.run_installation)
@@ -1963,25 +1912,86 @@ class BentoboxGUI:
     def run_installation(self):
         """Run the installation in background thread"""
         try:
+            # Progress comes over a socket; the terminal shows the output
+            runtime_dir = Path(os.environ.get('XDG_RUNTIME_DIR') or '/tmp')
+            events_socket = runtime_dir / f'bentobox-events-{os.getpid()}.sock'
+            if self.install_events is not None:
+                self.install_events.close()
+            self.install_events = EventListener(
+                events_socket,
+                lambda event: GLib.idle_add(self.on_install_event, event)
+            ).start()
+            
             # Spawn the orchestrator in the terminal
-            self.terminal.spawn_sync(
+            _, pid = self.terminal.spawn_sync(
                 Vte.PtyFlags.DEFAULT,
                 str(self.omakub_path),
-                ["python3", str(self.omakub_path / "install/orchestrator.py")],
+                ["python3", str(self.omakub_path / "install/orchestrator.py"),
+                 "--events-socket", str(events_socket)],
                 None,
                 GLib.SpawnFlags.DO_NOT_REAP_CHILD,
                 None,
                 None,
             )
-            
-            # Update UI when complete
-            GLib.idle_add(self.on_install_complete)
+            # Completion is reported by the run_finished event, or by
+            # child-exited if the orchestrator dies first
+            GLib.idle_add(self.terminal.watch_child, pid)
             
         except Exception as e:
             GLib.idle_add(self.on_install_error, str(e))
     
+    def on_install_event(self, event):
+        """Show orchestrator progress events above the terminal"""
+        kind = event.get('event')
+        if kind == 'run_started':
+            self.install_total = len(event.get('queue', []))
+            self.install_done = 0
+            self.install_running = []
+            self.install_progress.set_fraction(0)
+            self.install_progress.set_text(f"0 of {self.install_total} components")
+            self.install_progress.show()
+        elif kind == 'phase':
+            phases = {
+                'discover': "Discovering components...",
+                'preflight': "Checking what's already installed...",
+                'apt': "Installing system packages...",
+                'install': "Installing components...",
+                'post_install': "Applying fonts and theme...",
+            }
+            self.install_info_label.set_markup(f"<b>🚀 {phases.get(event.get('name'), 'Installing...')}</b>")
+        elif kind == 'component_started':
+            self.install_running.append(event['component'])
+        elif kind == 'component_finished':
+            if event['component'] in self.install_running:
+                self.install_running.remove(event['component'])
+            if event.get('status') != 'retrying':
+                self.install_done += 1
+        elif kind == 'component_status' and (event.get('error') or '').startswith('Prerequisite failed'):
+            self.install_done += 1  # Never started, but settled
+        elif kind == 'run_finished':
+            self.install_progress.set_fraction(1)
+            self.on_install_complete()
+        
+        if kind in ('component_started', 'component_finished', 'component_status') and self.install_total:
+            self.install_progress.set_fraction(min(1, self.install_done / self.install_total))
+            running = f" — {', '.join(self.install_running)}" if self.install_running else ""
+            self.install_progress.set_text(f"{self.install_done} of {self.install_total} components{running}")
+        return False
+    
+    def on_install_exited(self, terminal, status):
+        """Orchestrator exited; covers runs that ended without run_finished"""
+        self.on_install_complete()
+    
     def on_install_complete(self):
-        """Handle installation completion"""
+        """Handle installation completion, whichever of run_finished and
+        child-exited comes first"""
+        if not self.install_active:
+            return
+        self.install_active = False
+        if self.install_events is not None:
+            self.install_events.close()
+            self.install_events = None
+        
         self.install_btn.set_sensitive(True)
         self.install_btn.set_label("🚀 Start Installation")
         
@@ -1997,6 +2007,7 @@ class BentoboxGUI:
     
     def on_install_error(self, error_msg):
         """Handle installation error"""
+        self.install_active = False
         self.install_btn.set_sensitive(True)
         self.install_btn.set_label("🚀 Start Installation")
         
@@ -2026,12 +2037,14 @@ class BentoboxGUI:
             # Count statuses
             installed = sum(1 for c in components.values() if c['status'] == 'installed')
             already = sum(1 for c in components.values() if c['status'] == 'already_installed')
+            unchanged = sum(1 for c in components.values() if c['status'] == 'up_to_date')
             failed = sum(1 for c in components.values() if c['status'] == 'failed')
             skipped = sum(1 for c in components.values() if c['status'] == 'skipped')
             
             text = f"📊 Installation Status\n\n"
             text += f"✅ Installed this run: {installed}\n"
             text += f"📦 Already installed: {already}\n"
+            text += f"⏩ Unchanged since last run: {unchanged}\n"
             text += f"⚠️  Failed: {failed}\n"
             text += f"⏭️  Skipped: {skipped}\n"
             text += f"\n{'─' * 50}\n\n"
@@ -2043,6 +2056,7 @@ class BentoboxGUI:
                 icon = {
                     'installed': '✅',
                     'already_installed': '📦',
+                    'up_to_date': '⏩',
                     'failed': '⚠️',
                     'skipped': '⏭️',
                     'installing': '⏳'
@@ -0,0 +1,27 @@
+#!/bin/bash
+# Artifact downloads for Bentobox installers
+# Goes through the shared artifact cache (install/artifacts.py), so files
+# the orchestrator prefetched, or that an earlier run downloaded, are reused
+
+# Download a URL to a file through the artifact cache, falling back to wget
+# Usage: bentobox_fetch <url> [output-file] [sha256]
+bentobox_fetch() {
+    local url="$1"
+    local output="${2:-$(basename "${url%%\?*}")}"
+    local sha256="$3"
+    local cache="${OMAKUB_PATH:-$HOME/.local/share/omakub}/install/artifacts.py"
+
+    if command -v python3 &>/dev/null && [ -f "$cache" ]; then
+        if python3 "$cache" fetch "$url" --output "$output" ${sha256:+--sha256 "$sha256"}; then
+            return 0
+        fi
+        echo "⚠️  Artifact cache unavailable for $url, downloading directly"
+    fi
+
+    wget -O "$output" "$url" || return 1
+    if [ -n "$sha256" ] && ! echo "$sha256  $output" | sha256sum --check --status; then
+        echo "❌ Checksum mismatch for $url"
+        rm -f "$output"
+        return 1
+    fi
+}
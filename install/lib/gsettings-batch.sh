@@ -0,0 +1,43 @@
+#!/bin/bash
+# Batched GSettings writes for Bentobox scripts
+# Between gsettings_batch_begin and gsettings_batch_apply, `gsettings set`
+# calls are collected instead of run, then applied together by
+# install/settings_engine.py, which only writes keys whose value changed.
+# Other gsettings commands (get, reset, ...) still run immediately.
+#
+# Usage:
+#   source $OMAKUB_PATH/install/lib/gsettings-batch.sh
+#   gsettings_batch_begin
+#   gsettings set org.gnome.mutter center-new-windows true
+#   ...
+#   gsettings_batch_apply
+
+gsettings_batch_begin() {
+    BENTOBOX_GSETTINGS_BATCH=$(mktemp "${TMPDIR:-/tmp}/bentobox-gsettings.XXXXXX")
+}
+
+gsettings() {
+    if [ -n "$BENTOBOX_GSETTINGS_BATCH" ] && [ "$1" = "set" ] && [ $# -eq 4 ]; then
+        printf '%s\0%s\0%s\0' "$2" "$3" "$4" >> "$BENTOBOX_GSETTINGS_BATCH"
+        return 0
+    fi
+    command gsettings "$@"
+}
+
+gsettings_batch_apply() {
+    local batch="$BENTOBOX_GSETTINGS_BATCH"
+    local engine="${OMAKUB_PATH:-$HOME/.local/share/omakub}/install/settings_engine.py"
+    unset BENTOBOX_GSETTINGS_BATCH
+    [ -n "$batch" ] || return 0
+
+    if command -v python3 &>/dev/null && [ -f "$engine" ]; then
+        python3 "$engine" apply "$@" < "$batch"
+    else
+        # No engine: apply one key at a time, as before
+        local schema key value
+        while IFS= read -r -d '' schema && IFS= read -r -d '' key && IFS= read -r -d '' value; do
+            command gsettings set "$schema" "$key" "$value" 2>/dev/null || true
+        done < "$batch"
+    fi
+    rm -f "$batch"
+}
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Bentobox Component Manifest
+Everything the orchestrator knows about each installer script, compiled into
+~/.cache/bentobox/manifest.json. Only scripts whose mtime or size changed
+since the last run are read again.
+
+Installers describe themselves with a header of `# KEY: value` comments
+right after the shebang (the extension metadata block, see
+docs/extensions/FORMAT_SPEC.md):
+
+    #!/bin/bash
+    # CHECK_COMMAND: nvim --version
+    # REQUIRES: mise, libraries
+    # RESOURCES: network, cpu
+    # ARTIFACTS: https://github.com/neovim/neovim/releases/download/stable/nvim-linux-x86_64.tar.gz
+    # ESTIMATED_TIME: 45
+    # INTERACTIVE: yes
+
+Resource classes a header doesn't declare, the packages a script installs
+with apt and whether it prompts the user are found by scanning the script.
+
+    python3 install/manifest.py [--rebuild]
+"""
+
+import os
+import re
+import sys
+import json
+import fnmatch
+import argparse
+import tempfile
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from typing import Dict, List, Optional
+
+MANIFEST_FILE = Path.home() / '.cache/bentobox/manifest.json'
+MANIFEST_VERSION = 4  # Bump when compile_script() output changes
+
+# Shared system resources an installer may need exclusively or in limited
+# numbers, detected from what the script runs
+RESOURCE_PATTERNS = {
+    'dpkg-lock': re.compile(r'\b(apt|apt-get|dpkg|add-apt-repository)\s'),
+    'network': re.compile(r'\b(wget|curl|git\s+clone|flatpak\s+install|gext|bentobox_fetch)\s'),
+    'gsettings': re.compile(r'\b(gsettings|dconf)\s'),
+    'cpu': re.compile(r'\b(make|cargo\s+(build|install)|mise\s+(use|install))\b'),
+}
+
+# Package installs that can be lifted out of a script into one apt transaction
+APT_INSTALL_PATTERN = re.compile(
+    r'\b(?:(?:apt|apt-get)\s+(?:-\S+\s+)*install|distro_pkg_install|bentobox_pkg_install)\s+([^\n;&|>]*)'
+)
+
+# Prompts that read from the terminal (gum spin only draws on it)
+INTERACTIVE_PATTERN = re.compile(r'\bgum\s+(choose|confirm|input|write|filter|file)\b|\bread\s+-|</dev/tty\b')
+
+# sudo, directly or through the distro plugins' package helpers
+SUDO_PATTERN = re.compile(
+    r'\bsudo\s|\b(?:distro|bentobox)_(?:pkg_(?:update|upgrade|install|remove)|install_binary|add_repo)\b'
+)
+
+HEADER_PATTERN = re.compile(r'^#\s*([A-Z][A-Z_]*):(.*)$')
+
+# Where installers live: (directory, glob, category, selected by default)
+SOURCES = [
+    ('install/terminal', '*.sh', 'terminal', True),
+    ('install/desktop', 'app-*.sh', 'desktop', True),
+    ('install/desktop/optional', '*.sh', 'optional', False),
+]
+SKIP_SCRIPTS = {'terminal.sh'}  # Orchestrator scripts, not components
+
+
+@dataclass
+class ManifestEntry:
+    """One installer script. Header fields are None when it doesn't declare them"""
+    name: str
+    script: str
+    category: str  # terminal, desktop, optional
+    user_selected: bool
+    resources: List[str] = field(default_factory=list)  # Declared, or scanned
+    apt_packages: List[str] = field(default_factory=list)  # Scanned
+    check_command: Optional[str] = None
+    prerequisites: Optional[List[str]] = None
+    artifacts: Optional[List[str]] = None
+    estimated_time: Optional[float] = None  # Seconds
+    interactive: bool = False  # Prompts the user: declared, or scanned
+    uses_sudo: bool = False  # Scanned
+
+
+def component_name(script: Path, category: str) -> str:
+    """Component name from a script file name (app-github-cli.sh → github_cli)"""
+    name = script.stem.replace('app-', '')
+    if category == 'optional':
+        name = name.replace('download-', '')
+    return name.replace('-', '_')
+
+
+def parse_header(content: str) -> Dict[str, str]:
+    """`# KEY: value` lines from the comment block at the top of a script
+    
+    Repeated keys are joined with commas, so long lists can be split over
+    several lines.
+    """
+    header: Dict[str, str] = {}
+    for line in content.splitlines():
+        if line.startswith('#!'):
+            continue
+        if not line.startswith('#'):
+            break
+        match = HEADER_PATTERN.match(line)
+        if match:
+            key, value = match.group(1), match.group(2).strip()
+            header[key] = f"{header[key]},{value}" if header.get(key) else value
+    return header
+
+
+def _split(value: Optional[str]) -> Optional[List[str]]:
+    items = [item for item in re.split(r'[,\s]+', value or '') if item]
+    return items or None
+
+
+def _duration(value: Optional[str]) -> Optional[float]:
+    """Seconds from 90, 90s, 5m or 1h"""
+    match = re.fullmatch(r'(\d+(?:\.\d+)?)\s*([smh]?)', (value or '').strip())
+    if not match:
+        return None
+    return float(match.group(1)) * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+
+def scan_resources(content: str) -> List[str]:
+    """Detect which resource classes an installer script needs"""
+    # Ignore comment lines so "# uses apt" doesn't count
+    code = re.sub(r'^\s*#.*$', '', content, flags=re.MULTILINE)
+    return sorted(name for name, pattern in RESOURCE_PATTERNS.items() if pattern.search(code))
+
+
+def scan_apt_packages(script: Path, content: str) -> List[str]:
+    """Statically collect the packages an installer script installs with apt
+    
+    Only literal package names are taken; anything built from variables,
+    local .deb files or globs is left for the script to install itself.
+    Selector scripts (select-*.sh) install whatever the user picks, so
+    they are left alone too.
+    """
+    if script.name.startswith('select-'):
+        return []
+    
+    code = re.sub(r'^\s*#.*$', '', content, flags=re.MULTILINE)
+    code = code.replace('\\\n', ' ')
+    
+    packages = []
+    for match in APT_INSTALL_PATTERN.finditer(code):
+        for token in match.group(1).split():
+            if token.startswith('-') or re.search(r'[$"\'`/*=(){}]', token) or token.endswith('.deb'):
+                continue
+            if token not in packages:
+                packages.append(token)
+    return packages
+
+
+def scan_interactive(script: Path, content: str) -> bool:
+    """Whether an installer asks the user something while it runs"""
+    if script.name.startswith('select-'):
+        return True
+    code = re.sub(r'^\s*#.*$', '', content, flags=re.MULTILINE)
+    return bool(INTERACTIVE_PATTERN.search(code))
+
+
+def scan_sudo(content: str) -> bool:
+    """Whether an installer runs anything with sudo"""
+    code = re.sub(r'^\s*#.*$', '', content, flags=re.MULTILINE)
+    return bool(SUDO_PATTERN.search(code))
+
+
+def compile_script(script: Path, category: str, user_selected: bool) -> ManifestEntry:
+    """Read one installer's header and scan its body"""
+    try:
+        content = script.read_text(errors='replace')
+    except OSError:
+        content = ''
+    header = parse_header(content)
+    prerequisites = _split(header.get('REQUIRES'))
+    interactive = header.get('INTERACTIVE', '').lower()
+    
+    return ManifestEntry(
+        name=component_name(script, category),
+        script=str(script),
+        category=category,
+        user_selected=user_selected,
+        resources=sorted(_split(header.get('RESOURCES')) or scan_resources(content)),
+        apt_packages=scan_apt_packages(script, content),
+        check_command=header.get('CHECK_COMMAND') or None,
+        prerequisites=[p.replace('-', '_') for p in prerequisites] if prerequisites else None,
+        artifacts=_split(header.get('ARTIFACTS')),
+        estimated_time=_duration(header.get('ESTIMATED_TIME')),
+        interactive=interactive in ('yes', 'true', '1') if interactive else scan_interactive(script, content),
+        uses_sudo=scan_sudo(content),
+    )
+
+
+class Manifest:
+    """Compiled installer metadata for one OMAKUB_PATH, cached between runs"""
+    
+    def __init__(self, omakub_path: Path, cache_file: Path = MANIFEST_FILE):
+        self.omakub_path = Path(omakub_path)
+        self.cache_file = cache_file
+        self.compiled = 0  # Scripts read on the last load()
+    
+    def load(self, rebuild: bool = False) -> List[ManifestEntry]:
+        """Every installer in discovery order, recompiling only changed scripts"""
+        cached = {} if rebuild else self._read_cache()
+        scripts = {}
+        entries = []
+        self.compiled = 0
+        
+        for directory, pattern, category, user_selected in SOURCES:
+            try:
+                found = sorted((e for e in os.scandir(self.omakub_path / directory)
+                                if fnmatch.fnmatch(e.name, pattern) and e.name not in SKIP_SCRIPTS),
+                               key=lambda e: e.name)
+            except OSError:
+                continue
+            for script in found:
+                try:
+                    stat = script.stat()
+                except OSError:
+                    continue
+                
+                hit = cached.get(script.path)
+                if hit and hit['mtime_ns'] == stat.st_mtime_ns and hit['size'] == stat.st_size:
+                    data = hit['entry']
+                    entry = ManifestEntry(**data)
+                else:
+                    entry = compile_script(Path(script.path), category, user_selected)
+                    data = asdict(entry)
+                    self.compiled += 1
+                scripts[script.path] = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'entry': data}
+                entries.append(entry)
+        
+        if self.compiled or scripts.keys() != cached.keys():
+            self._write_cache(scripts)
+        return entries
+    
+    def _read_cache(self) -> Dict[str, dict]:
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != MANIFEST_VERSION or data.get('root') != str(self.omakub_path):
+            return {}
+        return data.get('scripts') or {}
+    
+    def _write_cache(self, scripts: Dict[str, dict]):
+        data = {'version': MANIFEST_VERSION, 'root': str(self.omakub_path), 'scripts': scripts}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_file.parent, prefix='.manifest-')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            pass  # Only a cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile and show installer metadata")
+    parser.add_argument('--rebuild', action='store_true', help="Read every script again")
+    parser.add_argument('--json', action='store_true', help="Print the manifest as JSON")
+    args = parser.parse_args()
+    
+    omakub_path = Path(os.environ.get('OMAKUB_PATH', Path.home() / '.local/share/omakub'))
+    manifest = Manifest(omakub_path)
+    entries = manifest.load(rebuild=args.rebuild)
+    
+    if args.json:
+        json.dump([asdict(e) for e in entries], sys.stdout, indent=2)
+        print()
+        return
+    for entry in entries:
+        details = []
+        if entry.check_command:
+            details.append(f"check: {entry.check_command}")
+        if entry.prerequisites:
+            details.append(f"after: {', '.join(entry.prerequisites)}")
+        if entry.resources:
+            details.append(f"holds: {', '.join(entry.resources)}")
+        if entry.artifacts:
+            details.append(f"{len(entry.artifacts)} artifact(s)")
+        if entry.estimated_time:
+            details.append(f"~{entry.estimated_time:.0f}s")
+        if entry.interactive:
+            details.append("interactive")
+        if entry.uses_sudo:
+            details.append("sudo")
+        print(f"  {entry.name:<28} {entry.category:<9} {'; '.join(details)}")
+    print(f"📋 {len(entries)} installers ({manifest.compiled} compiled, "
+          f"{len(entries) - manifest.compiled} from {manifest.cache_file})")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,14 +6,73 @@ Manages the installation state, dependencies, and execution of component install
 
 import os
 import sys
-import json
+import time
+import statistics
+import codecs
+import random
+import signal
+import argparse
+import shutil
+import shlex
+import tempfile
+import threading
 import subprocess
+import contextlib
 import yaml
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from enum import Enum
 
+from detection import DetectionEngine, DetectionSpec, read_dpkg_status
+from state_store import StateStore
+from fingerprint import FingerprintBuilder
+from artifacts import ArtifactCache, ArtifactPrefetcher
+from process_runner import ProcessCancelled, ProcessMetrics, ProcessTimeout, TimeoutPolicy, run_process, format_bytes, format_duration
+from events import EventStream
+from post_install import PostInstallPipeline
+from manifest import Manifest
+from package_mapping import PackageMapping, mapping_file
+from failures import Failure, FailureKind, classify
+from component_log import ComponentLog
+from governor import ConcurrencyGovernor, SystemMonitor, SystemSample, initial_limit, SAMPLE_INTERVAL as GOVERNOR_INTERVAL
+
+# How many components may hold each resource class at once
+DEFAULT_RESOURCE_LIMITS = {
+    'dpkg-lock': 1,   # apt/dpkg hold an exclusive lock
+    'gsettings': 1,   # avoid interleaving dconf writes
+    'network': 4,
+    'cpu': 1,         # compiles already use every core
+}
+
+# Installer time limits in seconds (settings: install_timeout, stall_timeout,
+# max_install_time). An installer's budget is a multiple of how long it took
+# before; past its budget it only runs on while it keeps making progress.
+DEFAULT_INSTALL_TIMEOUT = 300    # Budget for installers with no history or ESTIMATED_TIME yet
+DEFAULT_STALL_TIMEOUT = 120      # Stopped after this long with no progress at all
+DEFAULT_MAX_INSTALL_TIME = 3600  # Stopped after this long whatever it is doing
+BUDGET_FACTOR = 3                # Budget = 3 x the 95th percentile of past runs (or the estimate)
+MIN_BUDGET = 60
+HISTORY_SIZE = 20                # Past durations kept per component
+
+# What --plan assumes for installers that have never run and give no estimate
+UNKNOWN_DURATION = 30
+
+# Retries of transient failures (settings: retry_attempts, retry_delay)
+DEFAULT_RETRY_ATTEMPTS = 3  # Runs in total, including the first
+DEFAULT_RETRY_DELAY = 10    # Seconds before the first retry, doubled each time
+MAX_RETRY_DELAY = 300
+
+# Installers run in background process groups, where a sudo password
+# prompt would stop them; see _sudo_session()
+SUDO_REFRESH = 60  # Seconds between renewals of the cached sudo credentials
+SUDO_WRAPPER_DIR = Path.home() / '.cache/bentobox/bin'
+
+# Last output lines of a failed installer shown in the summary; the state
+# keeps the whole tail (settings: log_tail_kb)
+SUMMARY_TAIL_LINES = 8
+
 class ComponentStatus(Enum):
     NOT_INSTALLED = "not_installed"
     ALREADY_INSTALLED = "already_installed"
@@ -21,6 +80,22 @@ class ComponentStatus(Enum):
     INSTALLED = "installed"
     FAILED = "failed"
     SKIPPED = "skipped"
+    UP_TO_DATE = "up_to_date"  # Installed by a previous run and unchanged since
+    RETRYING = "retrying"  # Failed for a transient reason, waiting to run again
+    CANCELLED = "cancelled"  # Stopped, or never started, because the run was cancelled
+
+# Recorded for a component the last run queued but didn't install
+UNFINISHED_STATUSES = {ComponentStatus.INSTALLING.value, ComponentStatus.RETRYING.value,
+                       ComponentStatus.FAILED.value, ComponentStatus.CANCELLED.value}
+
+@dataclass
+class PlannedStep:
+    """When --plan expects a component to run"""
+    component: str
+    start: float  # Seconds after the installers start
+    duration: float
+    lane: int  # Which of the parallel jobs runs it (1-based)
+    source: str  # Where the duration comes from: history, last run, estimate or unknown
 
 @dataclass
 class Component:
@@ -29,142 +104,319 @@ class Component:
     category: str  # terminal, desktop, optional
     check_command: Optional[str] = None  # Command to check if installed
     prerequisites: List[str] = None  # Other components needed first
+    resources: List[str] = None  # Resource classes held while installing
+    apt_packages: List[str] = None  # Packages the script installs with apt
+    artifacts: List[str] = None  # URLs the script downloads (prefetched)
     user_selected: bool = True
     status: ComponentStatus = ComponentStatus.NOT_INSTALLED
     error_message: Optional[str] = None
+    fingerprint: Optional[str] = None  # Hash of everything the install depends on
+    fingerprint_inputs: Dict[str, str] = None  # Per-input hashes behind the fingerprint
+    estimated_time: Optional[float] = None  # Seconds, from the script's header
+    interactive: bool = False  # Prompts the user, so it runs in the terminal's foreground
+    uses_sudo: bool = False  # Runs something with sudo
+    metrics: Dict[str, float] = None  # Resource usage of the last install (see ProcessMetrics)
+    durations: List[float] = None  # Wall times of recent successful installs, oldest first
+    attempts: int = 0  # Runs so far in this session
+    retry_at: Optional[float] = None  # time.monotonic() after which a retry may start
+    failure: Optional[str] = None  # FailureKind value of the last failure
+    output_tail: Optional[str] = None  # Last few KB of output, kept when it failed
+    log_file: Optional[str] = None
     
     def __post_init__(self):
         if self.prerequisites is None:
             self.prerequisites = []
+        if self.resources is None:
+            self.resources = []
+        if self.apt_packages is None:
+            self.apt_packages = []
+        if self.fingerprint_inputs is None:
+            self.fingerprint_inputs = {}
+        if self.artifacts is None:
+            self.artifacts = []
+        if self.metrics is None:
+            self.metrics = {}
+        if self.durations is None:
+            self.durations = []
 
 class InstallationOrchestrator:
-    def __init__(self, config_path: Optional[str] = None):
+    def __init__(self, config_path: Optional[str] = None, max_workers: Optional[int] = None,
+                 resume: Optional[bool] = None, post_install: bool = True,
+                 events: Optional[EventStream] = None, plan_only: bool = False,
+                 sudo_session: bool = True):
         self.home = Path.home()
         self.omakub_path = Path(os.environ.get('OMAKUB_PATH', self.home / '.local/share/omakub'))
         self.state_file = self.home / '.bentobox-state.json'
-        self.config_path = config_path or self.home / '.bentobox-config.yaml'
+        self.state_store = StateStore(self.state_file)
+        self.config_path = Path(config_path) if config_path else self.home / '.bentobox-config.yaml'
         
         self.components: Dict[str, Component] = {}
         self.state: Dict[str, any] = {}
         self.config: Dict[str, any] = {}
         
+        # Parallel installation (command line wins over config)
+        self.max_workers = max_workers
+        self.min_workers = 1
+        self.adaptive = max_workers is None  # -j N fixes the number of jobs
+        self.resume = resume
+        self.post_install = post_install
+        self.plan_only = plan_only  # --plan: show what would run, install nothing
+        self.resource_limits: Dict[str, int] = {}
+        self.resource_locks: Dict[str, threading.BoundedSemaphore] = {}
+        self.install_timeout = DEFAULT_INSTALL_TIMEOUT
+        self.stall_timeout = DEFAULT_STALL_TIMEOUT
+        self.max_install_time = DEFAULT_MAX_INSTALL_TIME
+        self.retry_attempts = DEFAULT_RETRY_ATTEMPTS
+        self.retry_delay = DEFAULT_RETRY_DELAY
+        self.prefetcher: Optional[ArtifactPrefetcher] = None
+        self.sudo_session = sudo_session  # Prime and renew sudo for installers that use it
+        self.sudo_wrapper: Optional[Path] = None  # Directory put first on PATH for isolated installers
+        self.cancel = threading.Event()  # Set by Ctrl+C/SIGTERM while installing
+        self.events = events or EventStream()  # Disabled unless --events-fd/--events-socket
+        self.os_release = self._read_os_release()
+        self.distro_family = self._detect_distro_family()
+        
     def load_config(self):
         """Load user configuration"""
         if self.config_path.exists():
             with open(self.config_path) as f:
-                self.config = yaml.safe_load(f)
+                self.config = yaml.safe_load(f) or {}
             print(f"✓ Loaded config from {self.config_path}")
         else:
             print(f"ℹ No config file found, using defaults")
             self.config = {'mode': 'interactive'}
+        
+        settings = self.config.get('settings') or {}
+        self.adaptive = self.adaptive and settings.get('adaptive_parallel', True)
+        if self.max_workers is None:
+            self.max_workers = settings.get('max_parallel') or min(4, os.cpu_count() or 1)
+        self.max_workers = max(1, int(self.max_workers))
+        self.min_workers = max(1, min(self.max_workers, int(settings.get('min_parallel', 1))))
+        if self.resume is None:
+            self.resume = bool(settings.get('resume', False))
+        self.install_timeout = float(settings.get('install_timeout') or DEFAULT_INSTALL_TIMEOUT)
+        self.stall_timeout = float(settings.get('stall_timeout') or DEFAULT_STALL_TIMEOUT)
+        self.max_install_time = float(settings.get('max_install_time') or DEFAULT_MAX_INSTALL_TIME)
+        self.retry_attempts = max(1, int(settings.get('retry_attempts', DEFAULT_RETRY_ATTEMPTS)))
+        self.retry_delay = float(settings.get('retry_delay', DEFAULT_RETRY_DELAY))
+        
+        limits = {**DEFAULT_RESOURCE_LIMITS, **(settings.get('resource_limits') or {})}
+        self.resource_limits = {name: max(1, int(limit)) for name, limit in limits.items()}
+        self.resource_locks = {
+            name: threading.BoundedSemaphore(limit)
+            for name, limit in self.resource_limits.items()
+        }
     
     def load_state(self):
         """Load previous installation state"""
-        if self.state_file.exists():
-            with open(self.state_file) as f:
-                self.state = json.load(f)
+        if self.state_file.exists() or self.state_store.journal_file.exists():
+            self.state = self.state_store.load()
             print(f"✓ Loaded state from {self.state_file}")
         else:
             self.state = {}
     
-    def save_state(self):
-        """Save current installation state"""
-        state_data = {
-            'components': {
-                name: {
-                    'status': comp.status.value,
-                    'error': comp.error_message
-                }
-                for name, comp in self.components.items()
+    def save_state(self, comp: Optional[Component] = None):
+        """Save installation state
+        
+        With a component, only its status change is appended to the state
+        journal; without one, every component is written as a new snapshot.
+        """
+        if comp is not None:
+            self.events.emit('component_status', component=comp.name, status=comp.status.value, error=comp.error_message)
+            self.state_store.record(
+                comp.name,
+                status=comp.status.value,
+                error=comp.error_message,
+                fingerprint=comp.fingerprint,
+                inputs=comp.fingerprint_inputs,
+                metrics=comp.metrics,
+                durations=comp.durations,
+                failure=comp.failure,
+                output_tail=comp.output_tail,
+                log=comp.log_file
+            )
+            return
+        
+        self.state_store.replace({
+            name: {
+                'status': c.status.value,
+                'error': c.error_message,
+                'fingerprint': c.fingerprint,
+                'inputs': c.fingerprint_inputs,
+                'metrics': c.metrics,
+                'durations': c.durations,
+                'failure': c.failure,
+                'output_tail': c.output_tail,
+                'log': c.log_file
             }
-        }
-        with open(self.state_file, 'w') as f:
-            json.dump(state_data, f, indent=2)
+            for name, c in self.components.items()
+        })
     
     def discover_components(self):
-        """Scan install scripts and build component registry"""
+        """Build the component registry from the installer manifest
         
-        # Terminal components (always needed)
-        terminal_dir = self.omakub_path / 'install/terminal'
-        if terminal_dir.exists():
-            for script in terminal_dir.glob('*.sh'):
-                if script.name in ['terminal.sh']:  # Skip orchestrator scripts
-                    continue
-                
-                name = script.stem.replace('app-', '').replace('-', '_')
-                self.components[name] = Component(
-                    name=name,
-                    script=str(script),
-                    category='terminal',
-                    check_command=self._get_check_command(name)
-                )
-        
-        # Desktop components (basic apps)
-        desktop_dir = self.omakub_path / 'install/desktop'
-        if desktop_dir.exists():
-            for script in desktop_dir.glob('app-*.sh'):
-                name = script.stem.replace('app-', '').replace('-', '_')
-                self.components[name] = Component(
-                    name=name,
-                    script=str(script),
-                    category='desktop',
-                    check_command=self._get_check_command(name)
-                )
-        
-        # Optional components
-        optional_dir = self.omakub_path / 'install/desktop/optional'
-        if optional_dir.exists():
-            for script in optional_dir.glob('*.sh'):
-                name = script.stem.replace('app-', '').replace('download-', '').replace('-', '_')
-                self.components[name] = Component(
-                    name=name,
-                    script=str(script),
-                    category='optional',
-                    check_command=self._get_check_command(name),
-                    user_selected=False  # Optional = off by default
-                )
+        Header fields (see manifest.py) win; the hint tables below fill in
+        for installers that don't declare them.
+        """
+        manifest = Manifest(self.omakub_path)
+        for entry in manifest.load():
+            self.components[entry.name] = Component(
+                name=entry.name,
+                script=entry.script,
+                category=entry.category,
+                check_command=entry.check_command or self._get_check_command(entry.name),
+                prerequisites=entry.prerequisites or self._get_prerequisites(entry.name),
+                resources=list(entry.resources),
+                apt_packages=list(entry.apt_packages),
+                artifacts=entry.artifacts or self._get_artifacts(entry.name),
+                estimated_time=entry.estimated_time,
+                interactive=entry.interactive,
+                uses_sudo=entry.uses_sudo,
+                user_selected=entry.user_selected
+            )
         
         print(f"✓ Discovered {len(self.components)} components")
     
     def _get_check_command(self, name: str) -> Optional[str]:
-        """Get the command to check if a component is installed"""
-        # Map component names to their check commands
+        """Check command for installers without a CHECK_COMMAND header"""
         checks = {
-            'docker': 'docker --version',
-            'neovim': 'nvim --version',
-            'chrome': 'google-chrome --version',
-            'cursor': 'cursor --version',
-            'vscode': 'code --version',
-            'alacritty': 'alacritty --version',
-            'btop': 'btop --version',
-            'fastfetch': 'fastfetch --version',
-            'github_cli': 'gh --version',
-            'lazygit': 'lazygit --version',
-            'zellij': 'zellij --version',
-            'mise': 'mise --version',
             'nodejs': 'node --version',
             'python': 'python3 --version',
         }
         return checks.get(name)
     
+    def _get_prerequisites(self, name: str) -> List[str]:
+        """Prerequisites for installers without a REQUIRES header"""
+        return []
+    
+    def _get_artifacts(self, name: str) -> List[str]:
+        """Download URLs for installers without an ARTIFACTS header"""
+        artifacts = {
+            # Not a component, fetched for run_post_install
+            'fonts': [
+                'https://github.com/ryanoasis/nerd-fonts/releases/latest/download/CascadiaMono.zip',
+                'https://github.com/iaolo/iA-Fonts/archive/refs/heads/master.zip',
+            ],
+        }
+        return list(artifacts.get(name, []))
+    
+    def _get_config_keys(self, name: str) -> List[str]:
+        """Get the config sections an installer reads (dotted paths)"""
+        config_keys = {
+            'select_dev_language': ['languages'],
+            'select_dev_storage': ['containers'],
+            'select_web_apps': ['desktop.web_apps'],
+            'set_git': ['user'],
+        }
+        return config_keys.get(name, [])
+    
+    def _read_os_release(self) -> Dict[str, str]:
+        """Read /etc/os-release into a dict"""
+        os_release = {}
+        try:
+            with open('/etc/os-release') as f:
+                for line in f:
+                    key, _, value = line.strip().partition('=')
+                    os_release[key] = value.strip('"')
+        except OSError:
+            pass
+        return os_release
+    
+    def _detect_distro_family(self) -> str:
+        """Detect the distribution family, matching install/lib/distro-manager.sh"""
+        os_release = self.os_release
+        families = {
+            'ubuntu': 'ubuntu', 'pop': 'ubuntu', 'elementary': 'ubuntu', 'mint': 'ubuntu', 'neon': 'ubuntu',
+            'debian': 'debian', 'raspbian': 'debian',
+            'fedora': 'fedora',
+            'arch': 'arch', 'manjaro': 'arch', 'endeavouros': 'arch',
+            'rhel': 'rhel', 'rocky': 'rhel', 'almalinux': 'rhel', 'centos': 'rhel',
+        }
+        family = families.get(os_release.get('ID', ''))
+        if family:
+            return family
+        id_like = os_release.get('ID_LIKE', '')
+        if 'ubuntu' in id_like:
+            return 'ubuntu'
+        if 'debian' in id_like:
+            return 'debian'
+        return 'unknown'
+    
+    def _load_package_mapping(self) -> PackageMapping:
+        """Generic → distro package names (install/lib/package-mapping.yaml, compiled and cached)"""
+        return PackageMapping(mapping_file(self.omakub_path)).load()
+    
+    def _acquire_resources(self, comp: Component) -> bool:
+        """Take every resource class the component needs, or none of them"""
+        acquired = []
+        for name in sorted(comp.resources):
+            lock = self.resource_locks.get(name)
+            if lock is None:
+                continue
+            if not lock.acquire(blocking=False):
+                for held in acquired:
+                    held.release()
+                return False
+            acquired.append(lock)
+        return True
+    
+    def _release_resources(self, comp: Component):
+        """Give back the resource classes taken by _acquire_resources"""
+        for name in sorted(comp.resources):
+            lock = self.resource_locks.get(name)
+            if lock is not None:
+                lock.release()
+    
+    def _get_detection_hints(self, name: str) -> Dict[str, List[str]]:
+        """Get dpkg packages and launchers that show a component is installed"""
+        hints = {
+            'libraries': {'packages': ['build-essential']},
+            'typora': {'packages': ['typora']},
+            'vlc': {'packages': ['vlc']},
+            'xournalpp': {'packages': ['xournalpp']},
+            'gnome_sushi': {'packages': ['gnome-sushi']},
+            'gnome_tweak_tool': {'packages': ['gnome-tweaks']},
+            'flameshot': {'packages': ['flameshot']},
+            'wl_clipboard': {'packages': ['wl-clipboard']},
+            'timeshift': {'packages': ['timeshift']},
+            'obs_studio': {'packages': ['obs-studio']},
+            'brave': {'packages': ['brave-browser']},
+            'sublime_text': {'packages': ['sublime-text']},
+            'warp': {'packages': ['warp-terminal']},
+            'mainline_kernels': {'packages': ['mainline']},
+            'pinta': {'desktop_files': ['com.github.PintaProject.Pinta.desktop']},
+            'foliate': {'desktop_files': ['com.github.johnfactotum.Foliate.desktop']},
+            'kooha': {'desktop_files': ['io.github.seadve.Kooha.desktop']},
+            'planify': {'desktop_files': ['io.github.alainm23.planify.desktop']},
+            'mission_center': {'desktop_files': ['io.missioncenter.MissionCenter.desktop']},
+            'audacity': {'desktop_files': ['org.audacityteam.Audacity.desktop']},
+            'retroarch': {'desktop_files': ['org.libretro.RetroArch.desktop']},
+            'gimp': {'desktop_files': ['org.gimp.GIMP.desktop']},
+            'bitwig': {'desktop_files': ['com.bitwig.BitwigStudio.desktop']},
+            'picture_of_the_day': {'desktop_files': ['de.swsnr.pictureoftheday.desktop']},
+            'blender': {'desktop_files': ['blender_blender.desktop']},
+            'rubymine': {'desktop_files': ['rubymine_rubymine.desktop']},
+        }
+        return hints.get(name, {})
+    
     def run_preflight_check(self):
         """Check which components are already installed"""
         print("\n🔍 Running preflight check...")
         
-        for name, comp in self.components.items():
-            if comp.check_command:
-                try:
-                    result = subprocess.run(
-                        comp.check_command,
-                        shell=True,
-                        capture_output=True,
-                        timeout=5
-                    )
-                    if result.returncode == 0:
-                        comp.status = ComponentStatus.ALREADY_INSTALLED
-                        print(f"  ✓ {name} already installed")
-                except Exception:
-                    comp.status = ComponentStatus.NOT_INSTALLED
+        settings = self.config.get('settings') or {}
+        engine = DetectionEngine(max_probes=settings.get('preflight_workers', 4))
+        specs = [
+            DetectionSpec(name=name, check_command=comp.check_command, **self._get_detection_hints(name))
+            for name, comp in self.components.items()
+        ]
+        
+        for name, installed in engine.detect_all(specs).items():
+            if installed:
+                self.components[name].status = ComponentStatus.ALREADY_INSTALLED
+                print(f"  ✓ {name} already installed")
+        
+        if engine.cache_hits:
+            print(f"  ℹ {engine.cache_hits} of {len(specs)} results unchanged since last check")
     
     def apply_user_preferences(self):
         """Apply user selections from config"""
@@ -183,13 +435,64 @@ class InstallationOrchestrator:
                 else:
                     comp.user_selected = False
     
+    def apply_previous_state(self):
+        """Fingerprint components and, when resuming, skip unchanged ones
+        
+        Like make, a component previously recorded as installed is only
+        rebuilt when one of its inputs changed: its script, a helper it
+        sources, a config section it reads, or the distribution. The same
+        goes for components detection finds installed.
+        """
+        previous = self.state.get('components', {})
+        plugins = {'ubuntu': 'ubuntu', 'debian': 'debian', 'fedora': 'fedora', 'arch': 'arch', 'rhel': 'rocky'}
+        builder = FingerprintBuilder(
+            self.omakub_path,
+            self.config,
+            distro=f"{self.os_release.get('ID', 'unknown')} {self.os_release.get('VERSION_ID', '')}".strip(),
+            plugin=plugins.get(self.distro_family)
+        )
+        unchanged = 0
+        
+        for name, comp in self.components.items():
+            comp.metrics = (previous.get(name) or {}).get('metrics') or {}
+            comp.durations = (previous.get(name) or {}).get('durations') or []
+            comp.fingerprint_inputs = builder.inputs(Path(comp.script), self._get_config_keys(name))
+            comp.fingerprint = builder.digest(comp.fingerprint_inputs)
+            if not self.resume:
+                continue
+            
+            last = previous.get(name) or {}
+            if comp.status == ComponentStatus.ALREADY_INSTALLED:
+                # Detection can't tell an outdated installation from a current
+                # one: run it again if its inputs changed since it was
+                # recorded, or if the last run started it and didn't finish
+                if last.get('fingerprint') and last['fingerprint'] != comp.fingerprint:
+                    changed = builder.changed(last.get('inputs') or {}, comp.fingerprint_inputs)
+                    print(f"  ↻ {name}: installed, but {', '.join(changed) or 'fingerprint'} changed")
+                    comp.status = ComponentStatus.NOT_INSTALLED
+                elif last.get('status') in UNFINISHED_STATUSES:
+                    print(f"  ↻ {name}: installed, but the last run didn't finish it ({last['status']})")
+                    comp.status = ComponentStatus.NOT_INSTALLED
+                continue
+            if last.get('status') not in (ComponentStatus.INSTALLED.value, ComponentStatus.UP_TO_DATE.value):
+                continue
+            if last.get('fingerprint') == comp.fingerprint:
+                comp.status = ComponentStatus.UP_TO_DATE
+                unchanged += 1
+            elif comp.user_selected or comp.category != 'optional':
+                changed = builder.changed(last.get('inputs') or {}, comp.fingerprint_inputs)
+                print(f"  ↻ {name}: {', '.join(changed) or 'fingerprint'} changed")
+        
+        if self.resume:
+            print(f"\n⏩ Resuming: {unchanged} components unchanged since last run")
+    
     def build_install_queue(self) -> List[Component]:
         """Build ordered list of components to install"""
         queue = []
         
         for comp in self.components.values():
-            # Skip if already installed
-            if comp.status == ComponentStatus.ALREADY_INSTALLED:
+            # Skip if already installed, or installed last run and unchanged
+            if comp.status in (ComponentStatus.ALREADY_INSTALLED, ComponentStatus.UP_TO_DATE):
                 continue
             
             # Skip if not selected by user (for optional)
@@ -199,48 +502,606 @@ class InstallationOrchestrator:
             
             queue.append(comp)
         
-        # TODO: Sort by dependencies
-        return queue
+        return self._sort_by_dependencies(queue)
+    
+    def _sort_by_dependencies(self, queue: List[Component]) -> List[Component]:
+        """Order the queue so every component comes after its prerequisites
+        
+        Prerequisites that are not queued (already installed, skipped or
+        unknown) are treated as satisfied. Components that are part of, or
+        depend on, a dependency cycle are marked as failed and dropped.
+        """
+        queued = {comp.name: comp for comp in queue}
+        remaining = {
+            comp.name: {p for p in comp.prerequisites if p in queued}
+            for comp in queue
+        }
+        dependents: Dict[str, List[str]] = {name: [] for name in queued}
+        for name, prereqs in remaining.items():
+            for prereq in prereqs:
+                dependents[prereq].append(name)
+        
+        # Kahn's algorithm, keeping discovery order among ready components
+        ready = [comp.name for comp in queue if not remaining[comp.name]]
+        ordered = []
+        while ready:
+            name = ready.pop(0)
+            ordered.append(queued[name])
+            for dependent in dependents[name]:
+                remaining[dependent].discard(name)
+                if not remaining[dependent]:
+                    ready.append(dependent)
+        
+        if len(ordered) < len(queue):
+            placed = {comp.name for comp in ordered}
+            blocked = [comp for comp in queue if comp.name not in placed]
+            cycle = self._find_cycle({comp.name: remaining[comp.name] for comp in blocked})
+            print(f"\n⚠️  Dependency cycle detected: {' → '.join(cycle)}")
+            for comp in blocked:
+                comp.status = ComponentStatus.FAILED
+                comp.error_message = f"Dependency cycle: {' → '.join(cycle)}"
+                print(f"   • {comp.name} will not be installed")
+                self.events.emit('component_status', component=comp.name, status=comp.status.value,
+                                 error=comp.error_message)
+        
+        return ordered
+    
+    def _find_cycle(self, graph: Dict[str, set]) -> List[str]:
+        """Return one cycle from a graph in which every node has an unresolved edge"""
+        # Every blocked node still waits on another blocked node, so walking
+        # prerequisites from any node must eventually revisit one
+        path: List[str] = []
+        seen: Dict[str, int] = {}
+        node = next(iter(graph))
+        while node not in seen:
+            seen[node] = len(path)
+            path.append(node)
+            node = sorted(graph[node])[0]
+        return path[seen[node]:] + [node]
+    
+    def install_queue(self, queue: List[Component]) -> Tuple[int, int]:
+        """Install queued components, running independent ones in parallel
+        
+        The queue must already be in dependency order. A component is started
+        as soon as all of its queued prerequisites have finished, its
+        artifacts are prefetched and its resource classes are free; if any
+        prerequisite failed, the component is failed without running.
+        
+        Interactive components (prompts, selectors) run on their own: nothing
+        else starts while one runs, and when one is next it waits for the
+        running installers to finish, so prompts don't compete for the
+        terminal or get mixed into other installers' output.
+        
+        A component that failed for a transient reason goes back to the front
+        of the queue until its retry time, and the others keep going meanwhile.
+        Once the run is cancelled nothing new starts and running installers
+        are stopped.
+        
+        With adaptive_parallel, how many run at once follows the system's
+        load (see governor.py), between min_parallel and max_workers.
+        """
+        queued = {comp.name for comp in queue}
+        pending = list(queue)
+        finished: Dict[str, bool] = {}
+        running = {}
+        success_count = 0
+        failed_count = 0
+        governor = self._governor() if self.adaptive and self.max_workers > self.min_workers else None
+        held_back = False  # Something was ready to start but over the limit
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending or running:
+                limit = governor.update(len(running), held_back) if governor else self.max_workers
+                held_back = False
+                if self.cancel.is_set():
+                    for comp in pending:
+                        comp.status = ComponentStatus.CANCELLED
+                        comp.error_message = "Run cancelled before it started"
+                        self.save_state(comp)
+                    pending.clear()
+                
+                for comp in list(pending):
+                    if any(c.interactive for c in running.values()):
+                        break  # An interactive installer is using the terminal
+                    if comp.retry_at and comp.retry_at > time.monotonic():
+                        continue
+                    prereqs = [p for p in comp.prerequisites if p in queued]
+                    if any(p not in finished for p in prereqs):
+                        continue
+                    if any(not download.done() for download in self._artifact_downloads(comp)):
+                        continue
+                    if comp.interactive and running:
+                        break  # Let the others finish so it gets the terminal to itself
+                    if len(running) >= limit:
+                        held_back = True
+                        break
+                    
+                    failed_prereqs = [p for p in prereqs if not finished[p]]
+                    if not failed_prereqs and not self._acquire_resources(comp):
+                        continue
+                    
+                    pending.remove(comp)
+                    if failed_prereqs:
+                        comp.status = ComponentStatus.FAILED
+                        comp.error_message = f"Prerequisite failed: {', '.join(failed_prereqs)}"
+                        print(f"\n⏭️  Not installing {comp.name}: {comp.error_message}")
+                        self.save_state(comp)
+                        finished[comp.name] = False
+                        failed_count += 1
+                        continue
+                    
+                    running[pool.submit(self.install_component, comp)] = comp
+                
+                downloading = [
+                    download for comp in pending
+                    for download in self._artifact_downloads(comp) if not download.done()
+                ]
+                retries = [comp.retry_at for comp in pending if comp.retry_at]
+                next_retry = max(0.0, min(retries) - time.monotonic()) if retries else None
+                if not running and not downloading:
+                    if next_retry is None:
+                        break
+                    self.cancel.wait(next_retry)
+                    continue
+                
+                timeout = next_retry
+                if held_back:  # Look at the system again soon
+                    timeout = min(timeout, GOVERNOR_INTERVAL) if timeout is not None else GOVERNOR_INTERVAL
+                done, _ = wait([*running, *downloading], timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future not in running:
+                        continue
+                    comp = running.pop(future)
+                    self._release_resources(comp)
+                    result = future.result()
+                    if comp.status == ComponentStatus.RETRYING:
+                        pending.insert(0, comp)
+                        continue
+                    finished[comp.name] = result
+                    if finished[comp.name]:
+                        success_count += 1
+                    elif comp.status != ComponentStatus.CANCELLED:
+                        failed_count += 1
+        
+        return success_count, failed_count
+    
+    def _governor(self) -> ConcurrencyGovernor:
+        """Load-based job limit between min_parallel and max_workers"""
+        def on_change(previous: int, limit: int, reason: str, sample: SystemSample):
+            print(f"\n⚖️  Parallel jobs {previous} → {limit}: {reason}")
+            self.events.emit('concurrency', jobs=limit, reason=reason)
+        
+        governor = ConcurrencyGovernor(self.min_workers, self.max_workers, on_change=on_change)
+        print(f"⚖️  Starting with {governor.limit} of up to {self.max_workers} parallel jobs "
+              f"({governor.monitor.cpus} CPUs), adjusted to system load")
+        self.events.emit('concurrency', jobs=governor.limit, reason='start')
+        return governor
+    
+    def prefetch_artifacts(self, queue: List[Component]):
+        """Start downloading every queued component's artifacts in the background
+        
+        Downloads land in the shared artifact cache, where installers pick
+        them up through bentobox_fetch (install/lib/artifacts.sh); a failed
+        download just means the installer downloads it itself.
+        """
+        urls = [url for comp in queue for url in comp.artifacts]
+        if self.post_install and (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY')):
+            urls += self._get_artifacts('fonts')
+        if not urls:
+            return
+        
+        settings = self.config.get('settings') or {}
+        self.prefetcher = ArtifactPrefetcher(self._artifact_cache(), per_host=settings.get('prefetch_per_host', 2))
+        self.prefetcher.prefetch(urls)
+        print(f"\n🌐 Prefetching {len(urls)} artifacts in the background...")
+    
+    def _artifact_downloads(self, comp: Component) -> list:
+        """Futures for the component's prefetched artifacts"""
+        if self.prefetcher is None:
+            return []
+        return [self.prefetcher.downloads[url] for url in comp.artifacts if url in self.prefetcher.downloads]
+    
+    def _artifact_cache(self) -> ArtifactCache:
+        """The shared artifact cache, sized from settings.artifact_cache_mb"""
+        settings = self.config.get('settings') or {}
+        return ArtifactCache(max_size=settings.get('artifact_cache_mb', 2048) * 1024 ** 2)
+    
+    def _script_env(self) -> Dict[str, str]:
+        """Environment installer scripts run with"""
+        settings = self.config.get('settings') or {}
+        return {
+            **os.environ,
+            'OMAKUB_PATH': str(self.omakub_path),
+            'BENTOBOX_ARTIFACT_CACHE_MB': str(settings.get('artifact_cache_mb', 2048)),
+        }
+    
+    def install_apt_packages(self, queue: List[Component]):
+        """Install every queued component's apt packages in one transaction
+        
+        The installers still run their own apt commands afterwards, but those
+        find everything already installed and return immediately. Packages
+        apt has no candidate for yet (their repository is added by the
+        installer itself) are left to the installer.
+        """
+        settings = self.config.get('settings') or {}
+        if not settings.get('batch_apt', True) or not shutil.which('apt-get'):
+            return
+        
+        generic = [package for comp in queue for package in comp.apt_packages]
+        wanted = list(dict.fromkeys(self._load_package_mapping().resolve(generic, self.distro_family)))
+        
+        installed = read_dpkg_status()
+        wanted = [package for package in wanted if package not in installed]
+        if not wanted:
+            return
+        
+        print(f"\n📦 Preparing {len(wanted)} apt packages in a single transaction...")
+        sudo = [] if os.geteuid() == 0 else ['sudo']
+        try:
+            subprocess.run([*sudo, 'apt-get', 'update'], check=False)
+            
+            available = self._get_apt_candidates(wanted)
+            deferred = [package for package in wanted if package not in available]
+            if deferred:
+                print(f"  ℹ Left to installers (no candidate yet): {', '.join(deferred)}")
+            if not available:
+                return
+            
+            result = subprocess.run([*sudo, 'apt-get', 'install', '-y', *available], check=False)
+            if result.returncode == 0:
+                print(f"  ✅ Installed {len(available)} packages")
+            else:
+                print(f"  ⚠️  Batched apt install failed (exit code {result.returncode}), "
+                      f"installers will retry individually")
+        except Exception as e:
+            print(f"  ⚠️  Batched apt install error: {e} (installers will retry individually)")
+    
+    def _get_apt_candidates(self, packages: List[str]) -> List[str]:
+        """Return the packages apt can currently install, in the given order"""
+        result = subprocess.run(
+            ['apt-cache', 'policy', *packages],
+            capture_output=True,
+            text=True,
+            check=False
+        )
+        available = set()
+        package = None
+        for line in result.stdout.splitlines():
+            if line and not line[0].isspace() and line.endswith(':'):
+                package = line[:-1]
+            elif line.strip().startswith('Candidate:') and package:
+                if line.split(':', 1)[1].strip() != '(none)':
+                    available.add(package)
+        return [package for package in packages if package in available]
     
     def install_component(self, comp: Component) -> bool:
-        """Install a single component"""
-        print(f"\n📦 Installing {comp.name}...")
+        """Install a single component
+        
+        Returns False both when it failed and when it is waiting to be
+        retried (status RETRYING, see install_queue).
+        """
+        comp.attempts += 1
+        if comp.attempts == 1:
+            print(f"\n📦 Installing {comp.name}...")
+        else:
+            print(f"\n🔁 Installing {comp.name} (attempt {comp.attempts} of {self.retry_attempts})...")
+        self.events.emit('component_started', component=comp.name)
         comp.status = ComponentStatus.INSTALLING
-        self.save_state()
+        comp.retry_at = None
+        self.save_state(comp)
+        try:
+            return self._run_installer(comp)
+        finally:
+            self.events.emit('component_finished', component=comp.name, status=comp.status.value,
+                             error=comp.error_message, failure=comp.failure, metrics=comp.metrics)
+    
+    def _run_installer(self, comp: Component) -> bool:
+        """Run a component's script and record the outcome"""
+        
+        # bentobox_fetch reports what it downloaded here
+        downloads = tempfile.NamedTemporaryFile('r', prefix=f'bentobox-{comp.name}-', suffix='.downloads')
+        env = {**self._script_env(), 'BENTOBOX_ARTIFACT_LOG': downloads.name}
+        if self.sudo_wrapper is not None and not comp.interactive:
+            env['PATH'] = f"{self.sudo_wrapper}{os.pathsep}{env.get('PATH', os.defpath)}"
+        log = self._component_log(comp)
         
         try:
             # Run the installation script
-            result = subprocess.run(
+            returncode, metrics = run_process(
                 ['bash', comp.script],
-                env={**os.environ, 'OMAKUB_PATH': str(self.omakub_path)},
-                capture_output=False,
-                timeout=300  # 5 minute timeout per component
+                env=env,
+                timeout=self._timeout_policy(comp),
+                on_output=self._watch_output(comp, log),
+                on_overrun=lambda elapsed: print(f"  ⏳ {comp.name} is taking longer than usual "
+                                                 f"({elapsed:.0f}s) but still making progress"),
+                cancel=self.cancel,
+                isolate=not comp.interactive
             )
+            comp.metrics = self._with_downloads(comp, metrics, downloads).to_dict()
             
-            if result.returncode == 0:
+            if returncode == 0:
                 comp.status = ComponentStatus.INSTALLED
+                comp.error_message = None
+                comp.failure = None
+                comp.durations = (comp.durations + [round(metrics.wall_time, 2)])[-HISTORY_SIZE:]
                 print(f"  ✅ {comp.name} installed successfully")
-                self.save_state()
+                self.save_state(comp)
                 return True
             else:
-                comp.status = ComponentStatus.FAILED
-                comp.error_message = f"Exit code: {result.returncode}"
-                print(f"  ⚠️  {comp.name} failed (continuing anyway)")
-                self.save_state()
+                failure = classify(returncode, log.tail_lines())
+                comp.output_tail = log.tail_text()
+                comp.error_message = f"Exit code: {returncode} ({failure.describe()})"
+                self._failed(comp, failure)
                 return False
                 
-        except subprocess.TimeoutExpired:
+        except ProcessTimeout as e:
+            comp.metrics = self._with_downloads(comp, e.metrics, downloads).to_dict()
             comp.status = ComponentStatus.FAILED
-            comp.error_message = "Installation timeout"
-            print(f"  ⚠️  {comp.name} timed out (continuing anyway)")
-            self.save_state()
+            comp.failure = FailureKind.TIMEOUT.value
+            comp.output_tail = log.tail_text()
+            if e.stalled:
+                comp.error_message = f"Stalled: no output, CPU or I/O for {e.timeout:.0f}s"
+                print(f"  ⚠️  {comp.name} stalled (no progress for {e.timeout:.0f}s), stopped it (continuing anyway)")
+            else:
+                comp.error_message = f"Installation timeout ({e.timeout:.0f}s)"
+                print(f"  ⚠️  {comp.name} timed out (continuing anyway)")
+            self.save_state(comp)
+            return False
+        except ProcessCancelled as e:
+            comp.metrics = self._with_downloads(comp, e.metrics, downloads).to_dict()
+            comp.status = ComponentStatus.CANCELLED
+            comp.error_message = "Run cancelled while installing"
+            comp.output_tail = log.tail_text()
+            print(f"  🛑 {comp.name} stopped")
+            self.save_state(comp)
             return False
         except Exception as e:
             comp.status = ComponentStatus.FAILED
             comp.error_message = str(e)
+            comp.failure = FailureKind.SCRIPT_ERROR.value
+            comp.output_tail = log.tail_text()
             print(f"  ⚠️  {comp.name} error: {e} (continuing anyway)")
-            self.save_state()
+            self.save_state(comp)
             return False
+        finally:
+            downloads.close()
+            log.close()
+    
+    def _failed(self, comp: Component, failure: Failure):
+        """Record a failed run, scheduling a retry if the failure is transient"""
+        comp.failure = failure.kind.value
+        if failure.transient and comp.attempts < self.retry_attempts:
+            # Exponential backoff with jitter, so parallel retries don't hit
+            # the same mirror or lock at the same moment
+            delay = min(MAX_RETRY_DELAY, self.retry_delay * 2 ** (comp.attempts - 1))
+            delay *= random.uniform(0.8, 1.2)
+            comp.status = ComponentStatus.RETRYING
+            comp.retry_at = time.monotonic() + delay
+            print(f"  🔁 {comp.name} failed ({failure.describe()}), retrying in {delay:.0f}s "
+                  f"(attempt {comp.attempts + 1} of {self.retry_attempts})")
+            self.events.emit('component_retry', component=comp.name, attempt=comp.attempts + 1,
+                             delay=round(delay, 1), failure=comp.failure)
+        else:
+            comp.status = ComponentStatus.FAILED
+            print(f"  ⚠️  {comp.name} failed ({failure.describe()}) (continuing anyway)")
+            if failure.kind == FailureKind.SUDO:
+                print("     sudo credentials expired or were never given; run again from a terminal "
+                      "or allow passwordless sudo")
+        self.save_state(comp)
+    
+    def _timeout_policy(self, comp: Component) -> TimeoutPolicy:
+        """Time limits for one installer, from how long it took before
+        
+        Interactive scripts (selectors, confirmations) wait on the user,
+        which looks just like a stall, so they only get the hard limit.
+        """
+        if comp.interactive:
+            return TimeoutPolicy(limit=self.max_install_time)
+        
+        budget = self.install_timeout
+        if comp.estimated_time:
+            budget = max(MIN_BUDGET, BUDGET_FACTOR * comp.estimated_time)
+        if comp.durations:
+            history = sorted(comp.durations)
+            p95 = history[min(len(history) - 1, int(len(history) * 0.95))]
+            budget = max(MIN_BUDGET, BUDGET_FACTOR * p95)
+        return TimeoutPolicy(
+            budget=min(budget, self.max_install_time),
+            stall=self.stall_timeout,
+            limit=self.max_install_time
+        )
+    
+    def _component_log(self, comp: Component) -> ComponentLog:
+        """Open the component's log file, carrying on with it for a retry"""
+        settings = self.config.get('settings') or {}
+        log = ComponentLog(
+            comp.name,
+            tail_bytes=int(settings.get('log_tail_kb', 4) * 1024),
+            max_bytes=int(settings.get('log_max_mb', 5) * 1024 ** 2)
+        )
+        log.open(f"{comp.name} attempt {comp.attempts} {time.strftime('%Y-%m-%d %H:%M:%S')}",
+                 append=comp.attempts > 1)
+        comp.log_file = str(log.path)
+        comp.output_tail = None
+        return log
+    
+    def _watch_output(self, comp: Component, log: ComponentLog):
+        """Output callback that writes an installer's output to its log
+        and, when events are enabled, forwards it as log events"""
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        
+        def on_output(data: bytes):
+            log.write(data)
+            if self.events.enabled:
+                text = decoder.decode(data)
+                if text:
+                    self.events.emit('log', component=comp.name, data=text)
+        return on_output
+    
+    def _with_downloads(self, comp: Component, metrics: ProcessMetrics, downloads) -> ProcessMetrics:
+        """Add the bytes prefetched for a component and fetched by its script"""
+        for future in self._artifact_downloads(comp):
+            if future.done() and not future.exception():
+                metrics.download_bytes += future.result()
+        for line in downloads:
+            size, _, _ = line.partition('\t')
+            if size.isdigit():
+                metrics.download_bytes += int(size)
+        return metrics
+    
+    def print_metrics(self, queue: List[Component]):
+        """Table of what each installer cost, slowest first, and the critical path"""
+        measured = [c for c in queue if c.metrics and c.status in (ComponentStatus.INSTALLED, ComponentStatus.FAILED,
+                                                                      ComponentStatus.CANCELLED)]
+        if not measured:
+            return
+        
+        print("\n⏱️  Component Timings")
+        print(f"  {'Component':<24} {'Wall':>8} {'User':>8} {'Sys':>8} {'Memory':>8} {'Read':>8} {'Write':>8} {'Download':>9}")
+        for comp in sorted(measured, key=lambda c: c.metrics['wall_time'], reverse=True):
+            m = comp.metrics
+            print(f"  {comp.name:<24} {m['wall_time']:>7.1f}s {m['user_time']:>7.1f}s {m['sys_time']:>7.1f}s "
+                  f"{format_bytes(m.get('peak_memory_kb', m['max_rss_kb']) * 1024):>8} {format_bytes(m['read_bytes']):>8} "
+                  f"{format_bytes(m['write_bytes']):>8} {format_bytes(m.get('download_bytes', 0)):>9}")
+        
+        path, length = self._critical_path(measured, {c.name: c.metrics['wall_time'] for c in measured})
+        total = sum(c.metrics['wall_time'] for c in measured)
+        print(f"\n🧭 Critical path ({length:.1f}s of {total:.1f}s installer time): {' → '.join(path)}")
+    
+    def _critical_path(self, components: List[Component], durations: Dict[str, float]) -> Tuple[List[str], float]:
+        """Longest chain of prerequisites by wall time
+        
+        No amount of parallelism can finish the run faster than this chain.
+        Components must be in dependency order, as the install queue is.
+        """
+        finish: Dict[str, float] = {}
+        previous: Dict[str, Optional[str]] = {}
+        
+        for comp in components:
+            prereqs = [p for p in comp.prerequisites if p in finish]
+            before = max(prereqs, key=lambda p: finish[p], default=None)
+            previous[comp.name] = before
+            finish[comp.name] = (finish[before] if before else 0.0) + durations[comp.name]
+        
+        name = max(finish, key=finish.get)
+        length = finish[name]
+        path = []
+        while name:
+            path.append(name)
+            name = previous[name]
+        return list(reversed(path)), length
+    
+    def planned_jobs(self) -> int:
+        """Installers a plan runs at once: where the governor would start
+        the limit (see governor.py) when adaptive, otherwise max_workers"""
+        if not (self.adaptive and self.max_workers > self.min_workers):
+            return self.max_workers
+        monitor = SystemMonitor()
+        return initial_limit(self.min_workers, self.max_workers, monitor.cpus, monitor.sample())
+    
+    def plan(self, queue: List[Component], jobs: Optional[int] = None) -> List[PlannedStep]:
+        """Simulate install_queue with predicted durations
+        
+        Components start in the same order and under the same limits as a
+        real run: queue order, at most `jobs` (default: planned_jobs()) at
+        once, prerequisites finished, resource classes free and interactive
+        components on their own. Every installer is assumed to succeed,
+        prefetched downloads to be ready in time and the limit to stay
+        where it starts.
+        """
+        jobs = jobs or self.planned_jobs()
+        queued = {comp.name for comp in queue}
+        predicted = {comp.name: self._predicted_time(comp) for comp in queue}
+        pending = list(queue)
+        finished = set()
+        running: List[Tuple[float, int, Component]] = []  # (end, lane, component)
+        held: Dict[str, int] = {}
+        steps = []
+        now = 0.0
+        
+        while pending:
+            for comp in list(pending):
+                if len(running) >= jobs or any(c.interactive for _, _, c in running):
+                    break
+                if any(p in queued and p not in finished for p in comp.prerequisites):
+                    continue
+                if comp.interactive and running:
+                    break
+                if any(held.get(r, 0) >= self.resource_limits[r] for r in comp.resources if r in self.resource_limits):
+                    continue
+                
+                pending.remove(comp)
+                for r in comp.resources:
+                    held[r] = held.get(r, 0) + 1
+                lane = min(set(range(1, jobs + 1)) - {l for _, l, _ in running})
+                duration, source = predicted[comp.name]
+                running.append((now + duration, lane, comp))
+                steps.append(PlannedStep(comp.name, now, duration, lane, source))
+            
+            if not running:
+                break  # Nothing can start: blocked on components that aren't queued
+            
+            # Advance to the next finish, like install_queue's wait()
+            now = min(end for end, _, _ in running)
+            for item in [item for item in running if item[0] == now]:
+                running.remove(item)
+                finished.add(item[2].name)
+                for r in item[2].resources:
+                    held[r] -= 1
+        return steps
+    
+    def _predicted_time(self, comp: Component) -> Tuple[float, str]:
+        """Expected install time and where it comes from"""
+        if comp.durations:
+            return statistics.median(comp.durations), 'history'
+        if comp.metrics.get('wall_time'):
+            return comp.metrics['wall_time'], 'last run'
+        if comp.estimated_time:
+            return comp.estimated_time, 'estimate'
+        return UNKNOWN_DURATION, 'unknown'
+    
+    def print_plan(self, queue: List[Component]):
+        """What a run would do: order, parallel lanes, predicted time"""
+        print("\n" + "=" * 50)
+        print("🗺️  Execution Plan (dry run, nothing is installed)")
+        print("=" * 50)
+        if not queue:
+            print("\n✅ Nothing to install")
+            self.events.emit('plan', steps=[], predicted=0.0, jobs=self.max_workers)
+            return
+        
+        jobs = self.planned_jobs()
+        steps = self.plan(queue, jobs)
+        print(f"\n  {'Start':>8} {'Time':>8}  {'Lane':>4}  Component")
+        for step in steps:
+            note = '' if step.source == 'history' else f"  ({step.source})"
+            print(f"  {format_duration(step.start):>8} {format_duration(step.duration):>8}  "
+                  f"{step.lane:>4}  {step.component}{note}")
+        
+        print()
+        for lane in range(1, jobs + 1):
+            names = [step.component for step in steps if step.lane == lane]
+            if names:
+                print(f"  Lane {lane}: {' → '.join(names)}")
+        
+        total = max(step.start + step.duration for step in steps)
+        unknown = sum(1 for step in steps if step.source == 'unknown')
+        self.events.emit('plan', steps=[asdict(step) for step in steps], predicted=total, jobs=jobs)
+        print(f"\n⏱️  Predicted install time: {format_duration(total)} "
+              f"for {len(steps)} components on {jobs} parallel jobs")
+        if jobs != self.max_workers:
+            print(f"   Load-adjusted: a real run starts at {jobs} of up to {self.max_workers} jobs "
+                  f"and follows system load from there")
+        if unknown:
+            print(f"   {unknown} components have never run and are counted as {format_duration(UNKNOWN_DURATION)} each")
+        if (self.config.get('settings') or {}).get('batch_apt', True) and shutil.which('apt-get') \
+                and any(c.apt_packages for c in queue):
+            print("   Not included: the apt transaction that runs before the installers")
+        
+        planned = {step.component for step in steps}
+        path, length = self._critical_path([c for c in queue if c.name in planned],
+                                           {step.component: step.duration for step in steps})
+        print(f"🧭 Critical path ({format_duration(length)}): {' → '.join(path)}")
     
     def run_post_install(self):
         """Run post-installation tasks (fonts, themes, etc.)"""
@@ -255,50 +1116,8 @@ class InstallationOrchestrator:
         print("🎨 Post-Installation Setup")
         print("=" * 50)
         
-        # Install fonts
-        print("\n📝 Installing fonts...")
-        fonts_script = self.omakub_path / 'install/desktop/fonts.sh'
-        if fonts_script.exists():
-            try:
-                subprocess.run(['bash', str(fonts_script)], timeout=300, check=False)
-                print("  ✅ Fonts installed")
-            except Exception as e:
-                print(f"  ⚠️  Font installation failed: {e}")
-        
-        # Configure fonts in GNOME
-        print("\n⚙️  Configuring fonts...")
-        font_config_script = self.omakub_path / 'install/desktop/configure-fonts.sh'
-        if font_config_script.exists():
-            try:
-                subprocess.run(['bash', str(font_config_script)], timeout=60, check=False)
-                print("  ✅ Fonts configured")
-            except Exception as e:
-                print(f"  ⚠️  Font configuration failed: {e}")
-        
-        # Apply GNOME theme
-        print("\n🎨 Applying GNOME theme...")
-        theme_script = self.omakub_path / 'install/desktop/set-gnome-theme.sh'
-        if theme_script.exists():
-            try:
-                subprocess.run(
-                    ['bash', str(theme_script)],
-                    env={**os.environ, 'OMAKUB_PATH': str(self.omakub_path)},
-                    timeout=60,
-                    check=False
-                )
-                print("  ✅ Theme applied")
-            except Exception as e:
-                print(f"  ⚠️  Theme application failed: {e}")
-        
-        # Apply GNOME settings
-        print("\n⚙️  Applying GNOME settings...")
-        settings_script = self.omakub_path / 'install/desktop/set-gnome-settings.sh'
-        if settings_script.exists():
-            try:
-                subprocess.run(['bash', str(settings_script)], timeout=60, check=False)
-                print("  ✅ Settings applied")
-            except Exception as e:
-                print(f"  ⚠️  Settings application failed: {e}")
+        # Fonts download while the theme and settings are applied
+        PostInstallPipeline(self.omakub_path, self._script_env()).run()
         
         print("\n✨ Post-installation setup complete!")
     
@@ -306,72 +1125,237 @@ class InstallationOrchestrator:
         """Main orchestration flow"""
         print("🚀 Bentobox Installation Orchestrator")
         print("=" * 50)
+        started = time.monotonic()
         
         # 1. Load config and state
         self.load_config()
         self.load_state()
         
         # 2. Discover all available components
+        self.events.emit('phase', name='discover')
         self.discover_components()
         
         # 3. Run preflight to detect what's already installed
+        self.events.emit('phase', name='preflight')
         self.run_preflight_check()
         
         # 4. Apply user preferences
         self.apply_user_preferences()
         
+        # 4b. Carry over components a previous run finished (--resume)
+        self.apply_previous_state()
+        
         # 5. Build installation queue
         queue = self.build_install_queue()
+        if self.plan_only:
+            self.print_plan(queue)
+            return
+        self.save_state()
+        self.events.emit('run_started', components=len(self.components),
+                         queue=[c.name for c in queue], jobs=self.max_workers)
         
         if not queue:
             print("\n✅ All components already installed!")
             # Still run post-install for themes/fonts
-            self.run_post_install()
+            if self.post_install:
+                self.events.emit('phase', name='post_install')
+                self.run_post_install()
+            self.events.emit('run_finished', success=0, failed=0, skipped=0,
+                             duration=time.monotonic() - started)
             return
         
         print(f"\n📋 Installation plan: {len(queue)} components")
         for comp in queue:
             print(f"   • {comp.name} ({comp.category})")
         
-        # 6. Install each component
-        print("\n" + "=" * 50)
-        print("Starting installation...")
-        print("=" * 50)
+        # 6. Download artifacts while apt and the installers run
+        self.prefetch_artifacts(queue)
         
-        success_count = 0
-        failed_count = 0
-        
-        for comp in queue:
-            if self.install_component(comp):
-                success_count += 1
-            else:
-                failed_count += 1
+        with self._sudo_session(queue):
+            # 6b. Install all apt packages in one transaction
+            self.events.emit('phase', name='apt')
+            self.install_apt_packages(queue)
+            
+            # 7. Install components, independent ones in parallel
+            print("\n" + "=" * 50)
+            print(f"Starting installation ({self.max_workers} parallel jobs)...")
+            print("=" * 50)
+            
+            self.events.emit('phase', name='install')
+            with self._cancel_on_signals():
+                success_count, _ = self.install_queue(queue)
+        failed_count = sum(1 for c in self.components.values() if c.status == ComponentStatus.FAILED)
+        cancelled_count = sum(1 for c in self.components.values() if c.status == ComponentStatus.CANCELLED)
         
-        # 7. Run post-installation (fonts, themes)
-        self.run_post_install()
+        # 8. Run post-installation (fonts, themes)
+        if self.post_install and not self.cancel.is_set():
+            self.events.emit('phase', name='post_install')
+            self.run_post_install()
+        if self.prefetcher is not None:
+            self.prefetcher.shutdown()
         
-        # 8. Report results
+        # 9. Report results
+        self.print_metrics(queue)
         print("\n" + "=" * 50)
         print("📊 Installation Summary")
         print("=" * 50)
         print(f"  ✅ Successful: {success_count}")
         print(f"  ⚠️  Failed: {failed_count}")
+        if cancelled_count:
+            print(f"  🛑 Cancelled: {cancelled_count} (run again with --resume to finish)")
         print(f"  ⏭️  Skipped: {sum(1 for c in self.components.values() if c.status == ComponentStatus.SKIPPED)}")
         print(f"  📦 Already installed: {sum(1 for c in self.components.values() if c.status == ComponentStatus.ALREADY_INSTALLED)}")
+        retried = [c for c in queue if c.attempts > 1]
+        if retried:
+            print(f"  🔁 Retried after transient failures: {len(retried)} "
+                  f"({sum(1 for c in retried if c.status == ComponentStatus.INSTALLED)} then succeeded)")
+        if self.resume:
+            print(f"  ⏩ Unchanged since last run: {sum(1 for c in self.components.values() if c.status == ComponentStatus.UP_TO_DATE)}")
         
         if failed_count > 0:
             print("\n⚠️  Failed components:")
             for comp in self.components.values():
                 if comp.status == ComponentStatus.FAILED:
                     print(f"   • {comp.name}: {comp.error_message}")
+                    for line in (comp.output_tail or '').splitlines()[-SUMMARY_TAIL_LINES:]:
+                        print(f"       │ {line}")
+                    if comp.log_file:
+                        print(f"       Full log: {comp.log_file}")
+        
+        skipped_count = sum(1 for c in self.components.values() if c.status == ComponentStatus.SKIPPED)
+        self.events.emit('run_finished', success=success_count, failed=failed_count,
+                         skipped=skipped_count, cancelled=cancelled_count, duration=time.monotonic() - started)
         
+        self.state_store.close()
         print(f"\n💾 State saved to: {self.state_file}")
-        print("\n✅ Installation complete!")
+        if self.cancel.is_set():
+            print("\n🛑 Installation cancelled")
+        else:
+            print("\n✅ Installation complete!")
+    
+    @contextlib.contextmanager
+    def _sudo_session(self, queue: List[Component]):
+        """Ask for the sudo password once, in the foreground, and keep it cached
+        
+        Installers run in process groups of their own, outside the
+        terminal's foreground, so a sudo password prompt would stop them
+        (SIGTTIN) until the stall watchdog killed them. Instead the password
+        is asked for here, the cached credentials are renewed every
+        SUDO_REFRESH seconds until installing is over, and isolated
+        installers find a sudo wrapper first on PATH that adds -n: if the
+        credentials are gone anyway, sudo fails straight away with an error
+        that is reported as such.
+        
+        Only done when an isolated installer in the queue uses sudo, so
+        runs that don't need it never ask for a password.
+        """
+        sudo = shutil.which('sudo')
+        needed = any(c.uses_sudo and not c.interactive for c in queue)
+        if not (self.sudo_session and needed) or sudo is None or os.geteuid() == 0:
+            yield
+            return
+        
+        quiet = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+        if subprocess.run([sudo, '-n', '-v'], **quiet).returncode != 0:
+            if sys.stdin.isatty():
+                print("\n🔑 Installers need sudo; enter your password once for the whole run")
+                primed = subprocess.run([sudo, '-v']).returncode == 0
+            else:
+                primed = False
+            if not primed:
+                print("⚠️  No sudo credentials: installers that need sudo will fail (continuing anyway)")
+        self.sudo_wrapper = self._write_sudo_wrapper(sudo)
+        
+        stop = threading.Event()
+        
+        def refresh():
+            while not stop.wait(SUDO_REFRESH):
+                subprocess.run([sudo, '-n', '-v'], **quiet)
+        
+        refresher = threading.Thread(target=refresh, name='sudo-refresh', daemon=True)
+        refresher.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            refresher.join()
+            self.sudo_wrapper = None
+    
+    def _write_sudo_wrapper(self, sudo: str) -> Optional[Path]:
+        """Directory with a `sudo` that never prompts, or None if it can't be written"""
+        wrapper = SUDO_WRAPPER_DIR / 'sudo'
+        try:
+            SUDO_WRAPPER_DIR.mkdir(parents=True, exist_ok=True)
+            fd, partial = tempfile.mkstemp(dir=SUDO_WRAPPER_DIR, prefix='.sudo-')
+            with os.fdopen(fd, 'w') as f:
+                f.write("#!/bin/sh\n"
+                        "# Written by install/orchestrator.py: installers run in the background\n"
+                        "# and can't answer a password prompt\n"
+                        f"exec {shlex.quote(sudo)} -n \"$@\"\n")
+            os.chmod(partial, 0o755)
+            os.replace(partial, wrapper)
+        except OSError as e:
+            print(f"⚠️  Could not write {wrapper}: {e} (continuing anyway)")
+            return None
+        return SUDO_WRAPPER_DIR
+    
+    @contextlib.contextmanager
+    def _cancel_on_signals(self):
+        """Turn Ctrl+C, SIGTERM and SIGHUP into a clean cancellation
+        
+        Installers run in process groups of their own, so Ctrl+C only
+        reaches the orchestrator, which stops them (TERM, then KILL) and
+        records them as cancelled.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        
+        def on_signal(signum, frame):
+            if not self.cancel.is_set():
+                print(f"\n🛑 Cancelling ({signal.Signals(signum).name}): stopping running installers...")
+                self.events.emit('cancelling', signal=signal.Signals(signum).name)
+            self.cancel.set()
+        
+        previous = {sig: signal.signal(sig, on_signal) for sig in (signal.SIGINT, signal.SIGTERM, signal.SIGHUP)}
+        try:
+            yield
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
 
 def main():
-    config_path = sys.argv[1] if len(sys.argv) > 1 else None
-    orchestrator = InstallationOrchestrator(config_path)
-    orchestrator.run()
+    parser = argparse.ArgumentParser(description="Bentobox Installation Orchestrator")
+    parser.add_argument('config', nargs='?', help="Path to config file (default: ~/.bentobox-config.yaml)")
+    parser.add_argument('-j', '--jobs', type=int,
+                        help="Install this many components in parallel (instead of following the system's load)")
+    parser.add_argument('--resume', action='store_true', default=None,
+                        help="Skip components the last run installed, unless their script or config changed")
+    parser.add_argument('--skip-post-install', action='store_true',
+                        help="Don't apply fonts, theme and GNOME settings after installing")
+    parser.add_argument('--plan', action='store_true',
+                        help="Show the execution plan and predicted time without installing anything")
+    parser.add_argument('--events-fd', type=int, metavar='FD',
+                        help="Write JSON-lines progress events to this inherited file descriptor")
+    parser.add_argument('--events-socket', metavar='PATH',
+                        help="Write JSON-lines progress events to this listening Unix socket")
+    args = parser.parse_args()
+    
+    events = EventStream.open(fd=args.events_fd, socket_path=args.events_socket)
+    orchestrator = InstallationOrchestrator(
+        args.config,
+        max_workers=args.jobs,
+        resume=args.resume,
+        post_install=not args.skip_post_install,
+        events=events,
+        plan_only=args.plan
+    )
+    try:
+        orchestrator.run()
+    finally:
+        events.close()
+    if orchestrator.cancel.is_set():
+        sys.exit(130)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Bentobox Package Mapping
+Generic package names (python-gtk, ssl-dev, ...) resolved to each
+distribution's own, from install/lib/package-mapping.yaml. The YAML is
+compiled into one flat lookup table per distribution family in
+~/.cache/bentobox/package-mapping.json, and only parsed again when its
+mtime or size changes.
+
+Names are resolved in bulk, so mapping a few hundred packages costs one
+call rather than one per package:
+
+    python3 install/package_mapping.py --family fedora python-gtk ssl-dev
+    echo python-gtk ssl-dev | python3 install/package_mapping.py --stdin
+    python3 install/package_mapping.py --table      # name<TAB>mapped, every entry
+
+Names without an entry are returned unchanged.
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+MAPPING_CACHE = Path.home() / '.cache/bentobox/package-mapping.json'
+MAPPING_VERSION = 1  # Bump when compile_mapping() output changes
+
+# Families the YAML has no column for use a related one, as the shell
+# plugins do (debian.sh defers to ubuntu.sh)
+FAMILY_FALLBACKS = {
+    'debian': 'ubuntu',
+    'rhel': 'fedora',
+}
+
+# Keys of an entry that aren't distribution families
+METADATA_KEYS = {'description'}
+
+
+def mapping_file(omakub_path: Path) -> Path:
+    return Path(omakub_path) / 'install/lib/package-mapping.yaml'
+
+
+def compile_mapping(entries: dict) -> Dict[str, Dict[str, str]]:
+    """{family: {generic name: package name}} from the parsed YAML"""
+    tables: Dict[str, Dict[str, str]] = {}
+    for generic, names in (entries or {}).items():
+        if not isinstance(names, dict):
+            continue
+        for family, package in names.items():
+            if family in METADATA_KEYS or not isinstance(package, str) or not package.strip():
+                continue
+            tables.setdefault(family, {})[str(generic)] = package.strip()
+    
+    for family, fallback in FAMILY_FALLBACKS.items():
+        if fallback in tables:
+            tables[family] = {**tables[fallback], **tables.get(family, {})}
+    return tables
+
+
+class PackageMapping:
+    """Compiled package-mapping.yaml, cached between runs"""
+    
+    def __init__(self, source: Path, cache_file: Optional[Path] = MAPPING_CACHE):
+        self.source = Path(source)
+        self.cache_file = cache_file
+        self.compiled = False  # Whether the last load() parsed the YAML
+        self.tables: Dict[str, Dict[str, str]] = {}
+    
+    def load(self, rebuild: bool = False) -> 'PackageMapping':
+        """Read the lookup tables, compiling the YAML again if it changed"""
+        try:
+            stat = self.source.stat()
+        except OSError:
+            self.tables = {}
+            return self
+        key = {'source': str(self.source), 'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+        
+        cached = None if rebuild else self._read_cache()
+        if cached and cached.get('key') == key:
+            self.tables = cached['tables']
+            self.compiled = False
+            return self
+        
+        import yaml  # Only needed when the cache is stale
+        try:
+            with open(self.source) as f:
+                entries = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            print(f"⚠️  Could not read {self.source}: {e} (continuing anyway)", file=sys.stderr)
+            self.tables = {}
+            return self
+        self.tables = compile_mapping(entries)
+        self.compiled = True
+        self._write_cache({'version': MAPPING_VERSION, 'key': key, 'tables': self.tables})
+        return self
+    
+    def table(self, family: str) -> Dict[str, str]:
+        """Every generic name with an entry for the family, and what it maps to"""
+        return self.tables.get(family, {})
+    
+    def resolve(self, names: Iterable[str], family: str) -> List[str]:
+        """Map each name for the family, in order; unknown names stay as they are"""
+        table = self.table(family)
+        return [table.get(name, name) for name in names]
+    
+    def _read_cache(self) -> Optional[dict]:
+        if not self.cache_file:
+            return None
+        try:
+            with open(self.cache_file) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(data, dict) or data.get('version') != MAPPING_VERSION:
+            return None
+        return data
+    
+    def _write_cache(self, data: dict):
+        if not self.cache_file:
+            return
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.cache_file.parent, prefix='.package-mapping-')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.cache_file)
+        except OSError:
+            pass  # Only a cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map generic package names to a distribution's")
+    parser.add_argument('names', nargs='*', help="Generic package names")
+    parser.add_argument('--family', default=os.environ.get('BENTOBOX_DISTRO_FAMILY'),
+                        help="Distribution family (default: $BENTOBOX_DISTRO_FAMILY)")
+    parser.add_argument('--stdin', action='store_true', help="Also read names from stdin, whitespace-separated")
+    parser.add_argument('--table', action='store_true', help="Print every mapping for the family")
+    parser.add_argument('--rebuild', action='store_true', help="Parse the YAML again")
+    parser.add_argument('--mapping', type=Path, help="Mapping file (default: $OMAKUB_PATH/install/lib/package-mapping.yaml)")
+    args = parser.parse_args()
+    if not args.family:
+        parser.error("no distribution family: pass --family or set BENTOBOX_DISTRO_FAMILY")
+    
+    omakub_path = Path(os.environ.get('OMAKUB_PATH', Path.home() / '.local/share/omakub'))
+    mapping = PackageMapping(args.mapping or mapping_file(omakub_path)).load(rebuild=args.rebuild)
+    
+    if args.table:
+        for generic, package in sorted(mapping.table(args.family).items()):
+            print(f"{generic}\t{package}")
+        return
+    names = list(args.names)
+    if args.stdin:
+        names += sys.stdin.read().split()
+    if names:
+        print('\n'.join(mapping.resolve(names, args.family)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Bentobox Post-Install Pipeline
+Fonts, font configuration, GNOME theme, settings and wallpaper, run as a
+small dependency graph so the font download overlaps the GNOME steps.
+Shared by the orchestrator and the GUI.
+"""
+
+import subprocess
+import threading
+from pathlib import Path
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class PostInstallStep:
+    name: str
+    script: str  # Relative to OMAKUB_PATH
+    label: str  # Shown when the step starts
+    done: str  # Shown when it succeeds
+    after: List[str] = field(default_factory=list)  # Steps that must finish first
+    resources: List[str] = field(default_factory=list)  # Held while running, like installers
+    timeout: int = 60
+
+
+POST_INSTALL_STEPS = [
+    PostInstallStep('fonts', 'install/desktop/fonts.sh',
+                    "📝 Installing fonts...", "✅ Fonts installed",
+                    resources=['network'], timeout=300),
+    PostInstallStep('theme', 'install/desktop/set-gnome-theme.sh',
+                    "🎨 Applying GNOME theme...", "✅ Theme applied",
+                    resources=['gsettings']),
+    PostInstallStep('settings', 'install/desktop/set-gnome-settings.sh',
+                    "⚙️  Applying GNOME settings...", "✅ Settings applied",
+                    resources=['gsettings']),
+    # Also after settings: both set monospace-font-name, and this one must win
+    PostInstallStep('configure_fonts', 'install/desktop/configure-fonts.sh',
+                    "⚙️  Configuring fonts...", "✅ Fonts configured",
+                    after=['fonts', 'settings'], resources=['gsettings']),
+]
+
+WALLPAPER_STEP = PostInstallStep('wallpaper', 'install/desktop/set-wallpaper.sh',
+                                 "🖼️  Setting wallpaper...", "✅ Wallpaper set",
+                                 after=['theme'], resources=['gsettings'])
+
+
+class PostInstallPipeline:
+    """Runs post-install steps as soon as the steps they come after are done
+    
+    Steps that hold the same resource never run together (all GNOME steps
+    hold `gsettings`). A failed step is reported and the rest carry on, as
+    the serial version did. With `capture`, a step's output is collected
+    and passed to `log` when it finishes instead of going to our stdout.
+    """
+    
+    def __init__(self, omakub_path: Path, env: Dict[str, str],
+                 steps: Optional[List[PostInstallStep]] = None,
+                 log: Callable[[str], None] = print, capture: bool = False):
+        self.omakub_path = Path(omakub_path)
+        self.env = env
+        self.steps = [s for s in (steps or POST_INSTALL_STEPS) if (self.omakub_path / s.script).exists()]
+        self.log = log
+        self.capture = capture
+        
+        self._resources = {r: threading.Lock() for s in self.steps for r in s.resources}
+        self._futures: Dict[str, Future] = {}
+    
+    def run(self) -> Dict[str, bool]:
+        """Run every step, returning step name → succeeded"""
+        with ThreadPoolExecutor(max_workers=max(1, len(self.steps))) as pool:
+            # Steps are listed after the steps they depend on
+            for step in self.steps:
+                self._futures[step.name] = pool.submit(self._run_step, step)
+        return {name: future.result() for name, future in self._futures.items()}
+    
+    def _run_step(self, step: PostInstallStep) -> bool:
+        for name in step.after:
+            if name in self._futures:
+                self._futures[name].result()
+        
+        locks = [self._resources[r] for r in sorted(step.resources)]
+        for lock in locks:
+            lock.acquire()
+        try:
+            self.log(step.label)
+            result = subprocess.run(
+                ['bash', str(self.omakub_path / step.script)],
+                env=self.env,
+                capture_output=self.capture,
+                text=True,
+                timeout=step.timeout
+            )
+            if self.capture:
+                self.log(result.stdout + result.stderr)
+            if result.returncode != 0:
+                self.log(f"⚠️  {step.name} failed with exit code {result.returncode} (continuing anyway)")
+                return False
+            self.log(step.done)
+            return True
+        except Exception as e:
+            self.log(f"⚠️  {step.name} failed: {e} (continuing anyway)")
+            return False
+        finally:
+            for lock in reversed(locks):
+                lock.release()
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Bentobox Process Runner
+Runs installer scripts and measures what they cost: wall time, CPU time,
+peak memory and block I/O, taken from the kernel's rusage for the child.
+A watchdog stops installers that have stopped making progress.
+
+Each installer runs in its own process group, so stopping it (timeout or
+cancellation) stops everything it started: apt under sudo, wget, gext...
+"""
+
+import os
+import pty
+import sys
+import time
+import fcntl
+import select
+import signal
+import termios
+import threading
+import subprocess
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class ProcessMetrics:
+    """Resource usage of one installer run, including everything it spawned"""
+    wall_time: float = 0.0  # seconds
+    user_time: float = 0.0  # CPU seconds in user mode
+    sys_time: float = 0.0  # CPU seconds in the kernel
+    max_rss_kb: int = 0  # rusage peak of the largest process (includes the orchestrator's own, inherited at fork)
+    peak_memory_kb: int = 0  # peak combined resident memory of the process tree, sampled
+    read_bytes: int = 0  # block I/O, from rusage block counts
+    write_bytes: int = 0
+    download_bytes: int = 0  # artifact bytes fetched over the network
+    
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+class ProcessTimeout(subprocess.TimeoutExpired):
+    """Timeout that still carries the usage of the killed process"""
+    
+    def __init__(self, cmd, timeout: float, stalled: bool = False, metrics: Optional[ProcessMetrics] = None):
+        super().__init__(cmd, timeout)
+        self.metrics = metrics or ProcessMetrics()
+        self.stalled = stalled  # Killed for making no progress, not for its running time
+
+
+class ProcessCancelled(Exception):
+    """The process was stopped because the run was cancelled"""
+    
+    def __init__(self, cmd, metrics: Optional[ProcessMetrics] = None):
+        super().__init__(f"Command '{cmd}' was cancelled")
+        self.cmd = cmd
+        self.metrics = metrics or ProcessMetrics()
+
+
+@dataclass
+class TimeoutPolicy:
+    """When to give up on a process
+    
+    A process is killed once it has shown no progress for `stall` seconds;
+    after running past `budget`, once it has shown none for `overrun_stall`
+    seconds; and after `limit` seconds whatever it is doing. Progress is
+    any CPU time, read or write (terminal output, disk, network sockets)
+    or process started or exited anywhere in its process tree.
+    """
+    budget: Optional[float] = None
+    stall: Optional[float] = None
+    overrun_stall: float = 30.0
+    limit: Optional[float] = None
+    
+    def expired(self, elapsed: float, idle: float) -> Optional[Tuple[float, bool]]:
+        """(the limit that has run out, whether it was a stall), if any"""
+        if self.limit and elapsed >= self.limit:
+            return self.limit, False
+        if self.stall and idle >= self.stall:
+            return self.stall, True
+        if self.budget and elapsed >= self.budget and idle >= self.overrun_stall:
+            return self.overrun_stall, True
+        return None
+
+
+# rusage block counts are in 512-byte units on Linux
+BLOCK_SIZE = 512
+
+# How often the watchdog samples the process tree (seconds)
+SAMPLE_INTERVAL = 1.0
+
+# Seconds between SIGTERM and SIGKILL when stopping a process tree; sudo
+# only passes SIGTERM on to the command it runs, so it must come first
+KILL_GRACE = 5.0
+
+PAGE_KB = os.sysconf('SC_PAGE_SIZE') // 1024
+
+# Popen arguments that start the child in a process group of its own. Not a
+# new session: sudo's cached credentials are tied to our terminal
+NEW_PROCESS_GROUP = {'process_group': 0} if sys.version_info >= (3, 11) else {'preexec_fn': os.setpgrp}
+
+
+def run_process(argv: List[str], env: Optional[Dict[str, str]] = None,
+                timeout: Optional[TimeoutPolicy] = None,
+                on_output: Optional[Callable[[bytes], None]] = None,
+                on_overrun: Optional[Callable[[float], None]] = None,
+                cancel: Optional[threading.Event] = None,
+                isolate: bool = True) -> Tuple[int, ProcessMetrics]:
+    """Run a command to completion, returning (exit code, metrics)
+    
+    The child is reaped with os.wait4() so its rusage (which includes the
+    children it waited for) is available. When the timeout policy says so
+    the child's process tree is stopped and ProcessTimeout is raised;
+    on_overrun is called once if it runs past its budget but is still
+    making progress. Once cancel is set, the tree is stopped and
+    ProcessCancelled raised.
+    
+    With isolate, the child gets a process group of its own. Processes
+    outside the terminal's foreground group can't read from it, so
+    commands that prompt the user need isolate=False.
+    
+    With on_output, the child's stdout/stderr go through a pseudo-terminal
+    (so prompts, colours and progress bars behave as before); everything
+    it writes is still echoed to our stdout and also passed to on_output.
+    """
+    start = time.monotonic()
+    relay = None
+    group = NEW_PROCESS_GROUP if isolate else {}
+    if on_output is None:
+        process = subprocess.Popen(argv, env=env, **group)
+    else:
+        master, slave = pty.openpty()
+        _prepare_terminal(slave)
+        try:
+            process = subprocess.Popen(argv, env=env, stdout=slave, stderr=slave, **group)
+        except Exception:
+            os.close(master)
+            raise
+        finally:
+            os.close(slave)
+        relay = _OutputRelay(master, on_output)
+        relay.start()
+    tree = ProcessTree(process.pid, group=isolate)
+    tree.sample()  # Most installers exit before the watchdog's first sample
+    try:
+        if timeout is None and cancel is None:
+            _, status, usage = os.wait4(process.pid, 0)
+            expired = None
+        else:
+            status, usage, expired = _watch(process, tree, start, timeout or TimeoutPolicy(), on_overrun, cancel)
+    finally:
+        if relay:
+            relay.finish()
+    
+    # Popen must not try to reap the pid again
+    process.returncode = os.waitstatus_to_exitcode(status)
+    
+    metrics = ProcessMetrics(
+        wall_time=time.monotonic() - start,
+        user_time=usage.ru_utime,
+        sys_time=usage.ru_stime,
+        max_rss_kb=usage.ru_maxrss,
+        read_bytes=usage.ru_inblock * BLOCK_SIZE,
+        write_bytes=usage.ru_oublock * BLOCK_SIZE,
+        peak_memory_kb=tree.peak_rss_kb,
+    )
+    if expired == CANCELLED:
+        raise ProcessCancelled(argv, metrics=metrics)
+    if expired is not None:
+        raise ProcessTimeout(argv, *expired, metrics=metrics)
+    return process.returncode, metrics
+
+
+# What _watch() returns in place of an expired limit when cancelled
+CANCELLED = 'cancelled'
+
+
+def _watch(process: subprocess.Popen, tree: 'ProcessTree', start: float, policy: TimeoutPolicy,
+           on_overrun: Optional[Callable[[float], None]], cancel: Optional[threading.Event]):
+    """Wait for the child, stopping its tree when the policy runs out or
+    the run is cancelled
+    
+    Returns (wait status, rusage, what TimeoutPolicy.expired() returned,
+    CANCELLED or None).
+    """
+    try:
+        exit_fd = os.pidfd_open(process.pid)  # Readable once the child exits
+    except (AttributeError, OSError):
+        exit_fd = None
+    last_progress = start
+    overran = False
+    
+    try:
+        while True:
+            # Wait first: most installers finish before the first sample
+            if exit_fd is not None:
+                select.select([exit_fd], [], [], SAMPLE_INTERVAL)
+            else:
+                _sleep_until_exit(process.pid, SAMPLE_INTERVAL)
+            pid, status, usage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                return status, usage, None
+            
+            now = time.monotonic()
+            if tree.progressed():
+                last_progress = now
+            expired = CANCELLED if cancel is not None and cancel.is_set() else None
+            expired = expired or policy.expired(now - start, now - last_progress)
+            if expired is not None:
+                status, usage = tree.terminate(exit_fd)
+                return status, usage, expired
+            if policy.budget and not overran and now - start >= policy.budget:
+                overran = True
+                if on_overrun:
+                    on_overrun(now - start)
+    finally:
+        if exit_fd is not None:
+            os.close(exit_fd)
+
+
+def _sleep_until_exit(pid: int, duration: float):
+    """Without pidfds: short sleeps, so a finished child isn't left waiting"""
+    deadline = time.monotonic() + duration
+    while time.monotonic() < deadline:
+        if not os.path.exists(f'/proc/{pid}') or _is_zombie(pid):
+            return
+        time.sleep(0.05)
+
+
+def _is_zombie(pid: int) -> bool:
+    stat = _read_stat(pid)
+    return stat is not None and stat[0] == 'Z'
+
+
+def _read_stat(pid: int) -> Optional[List[str]]:
+    """Fields of /proc/<pid>/stat after the command name (state is first)"""
+    try:
+        with open(f'/proc/{pid}/stat') as f:
+            return f.read().rsplit(')', 1)[1].split()
+    except (OSError, IndexError):
+        return None
+
+
+def _start_time(pid: int) -> Optional[str]:
+    """When the process started (clock ticks after boot), to tell a reused pid apart"""
+    stat = _read_stat(pid)
+    return stat[19] if stat else None
+
+
+class ProcessTree:
+    """Activity of a process and all its descendants, read from /proc
+    
+    With group, the root leads a process group of its own (see
+    NEW_PROCESS_GROUP) and the whole group is signalled when stopping it.
+    """
+    
+    def __init__(self, root: int, group: bool = False):
+        self.root = root
+        self.group = group
+        self.peak_rss_kb = 0  # Highest combined RSS seen by sample()
+        self._last = None
+    
+    def progressed(self) -> bool:
+        """Whether anything in the tree moved since the last call"""
+        sample = self.sample()
+        changed = sample != self._last
+        self._last = sample
+        return changed
+    
+    def sample(self) -> Tuple[frozenset, int, int]:
+        """(pids, CPU ticks, bytes read + written) for the whole tree"""
+        pids = self.pids()
+        ticks = 0
+        io = 0
+        rss = 0
+        for pid in pids:
+            stat = _read_stat(pid)
+            if stat:
+                ticks += int(stat[11]) + int(stat[12])  # utime, stime
+                rss += int(stat[21])
+            try:
+                with open(f'/proc/{pid}/io') as f:
+                    for line in f:
+                        if line.startswith(('rchar:', 'wchar:')):
+                            io += int(line.split()[1])
+            except OSError:
+                pass  # Processes of other users (sudo) only count by CPU
+        self.peak_rss_kb = max(self.peak_rss_kb, rss * PAGE_KB)
+        return frozenset(pids), ticks, io
+    
+    def pids(self) -> List[int]:
+        children: Dict[int, List[int]] = {}
+        for entry in os.listdir('/proc'):
+            if entry.isdigit():
+                stat = _read_stat(int(entry))
+                if stat:
+                    children.setdefault(int(stat[1]), []).append(int(entry))
+        
+        tree = [self.root]
+        for pid in tree:
+            tree.extend(children.get(pid, []))
+        return tree
+    
+    def terminate(self, exit_fd: Optional[int] = None, grace: float = KILL_GRACE):
+        """SIGTERM the tree, SIGKILL whatever is left after grace seconds,
+        and reap the root. Returns (wait status, rusage)"""
+        # Descendants that left the group (setsid) are found before the
+        # root exits and they are reparented away from it
+        started = {pid: _start_time(pid) for pid in self.pids()}
+        self._signal(list(started), signal.SIGTERM)
+        self._signal(list(started), signal.SIGCONT)  # Stopped processes act on SIGTERM only once resumed
+        
+        if exit_fd is not None:
+            select.select([exit_fd], [], [], grace)
+        else:
+            _sleep_until_exit(self.root, grace)
+        # Pids that exited during the grace period may have been reused by
+        # now: only those with the same start time are still ours
+        survivors = [pid for pid, start in started.items() if start is not None and _start_time(pid) == start]
+        self._signal(list(dict.fromkeys(survivors + self.pids())), signal.SIGKILL)
+        _, status, usage = os.wait4(self.root, 0)
+        return status, usage
+    
+    def _signal(self, pids: List[int], sig: int):
+        if self.group:
+            try:
+                os.killpg(self.root, sig)
+            except OSError:
+                pass  # Everything in the group has exited
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except OSError:
+                pass  # Gone, or another user's (sudo passes SIGTERM on)
+
+
+class _OutputRelay(threading.Thread):
+    """Copies a child's terminal output to our stdout and a callback"""
+    
+    def __init__(self, master: int, on_output: Callable[[bytes], None]):
+        super().__init__(daemon=True)
+        self.master = master
+        self.on_output = on_output
+        self.exited = threading.Event()
+    
+    def run(self):
+        try:
+            while True:
+                readable, _, _ = select.select([self.master], [], [], 0.1)
+                if not readable:
+                    # Background processes may keep the terminal open; stop
+                    # once the child has exited and nothing is left to read
+                    if self.exited.is_set():
+                        return
+                    continue
+                try:
+                    data = os.read(self.master, 65536)
+                except OSError:
+                    return  # EIO: every writer has closed the terminal
+                if not data:
+                    return
+                os.write(sys.stdout.fileno(), data)
+                self.on_output(data)
+        finally:
+            os.close(self.master)
+    
+    def finish(self):
+        self.exited.set()
+        self.join()
+
+
+def _prepare_terminal(slave: int):
+    """Give the child's terminal our window size and plain newlines"""
+    try:
+        size = fcntl.ioctl(sys.stdout.fileno(), termios.TIOCGWINSZ, b'\0' * 8)
+        fcntl.ioctl(slave, termios.TIOCSWINSZ, size)
+    except OSError:
+        pass  # Our stdout isn't a terminal
+    attrs = termios.tcgetattr(slave)
+    attrs[1] &= ~termios.ONLCR  # Our own terminal adds the carriage returns
+    termios.tcsetattr(slave, termios.TCSANOW, attrs)
+
+
+def format_bytes(size: float) -> str:
+    """Human readable byte count"""
+    for unit in ('B', 'K', 'M', 'G'):
+        if size < 1024 or unit == 'G':
+            return f"{size:.0f}{unit}" if unit == 'B' else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def format_duration(seconds: float) -> str:
+    """Human readable duration (45s, 5m 12s, 1h 05m)"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Bentobox Fleet Rollout
+Runs the orchestrator on many workstations at once: the config is copied
+to each host, the orchestrator runs there with its progress events sent
+back over the transport, and every host gets its own log and state entry.
+
+    python3 install/rollout.py ws-01 ws-02 dev@ws-03 --config fleet.yaml
+    python3 install/rollout.py --hosts fleet.txt -c 8 --plan
+    python3 install/rollout.py --hosts fleet.txt --only-failed
+
+Hosts need Bentobox checked out at ~/.local/share/omakub (or --remote-path)
+and non-interactive sudo, and the config should use `mode: unattended`.
+The local transport treats each "host" as a separate HOME on this machine,
+for trying out rollouts without a fleet. It runs real installers, so it
+needs either a tree to install from or generated stubs (see benchmark.py):
+
+    python3 install/rollout.py --transport local --stubs 20 h1 h2 h3
+    python3 install/rollout.py --transport local --omakub-path ~/src/bentobox h1
+    python3 install/rollout.py --check      # fan-out and aggregation self-check
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import shlex
+import shutil
+import argparse
+import tempfile
+import subprocess
+from abc import ABC, abstractmethod
+from pathlib import Path
+from dataclasses import dataclass, field, asdict
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Callable, Dict, Iterable, List, Optional
+
+from state_store import StateStore
+from process_runner import format_duration
+
+ROLLOUT_DIR = Path.home() / '.cache/bentobox/rollout'
+ROLLOUT_STATE = Path.home() / '.bentobox-rollout-state.json'
+REMOTE_OMAKUB_PATH = '$HOME/.local/share/omakub'
+LOCAL_ORCHESTRATOR = Path(__file__).resolve().parent / 'orchestrator.py'
+
+# ssh exits with 255 when it couldn't connect or authenticate
+SSH_CONNECT_FAILED = 255
+
+UNSAFE_FILENAME = re.compile(r'[^\w.@-]')
+
+
+class TransportError(Exception):
+    """The host could not be reached"""
+
+
+class Transport(ABC):
+    """How commands reach one host"""
+    
+    def __init__(self, host: str):
+        self.host = host
+    
+    @abstractmethod
+    def put(self, content: bytes, path: str):
+        """Write a file on the host (path relative to its home directory)"""
+    
+    @abstractmethod
+    def start(self, script: str, stdout, stderr) -> subprocess.Popen:
+        """Start a shell script on the host, connected to local stdout/stderr"""
+    
+    def unreachable(self, returncode: int) -> bool:
+        """Whether an exit code means the host was never reached"""
+        return False
+
+
+class SSHTransport(Transport):
+    """OpenSSH, never prompting: keys or an agent must already work"""
+    
+    def __init__(self, host: str, options: Optional[List[str]] = None):
+        super().__init__(host)
+        self.options = ['-o', 'BatchMode=yes', '-o', 'ConnectTimeout=10', *(options or [])]
+    
+    def put(self, content: bytes, path: str):
+        target = f'"$HOME"/{shlex.quote(path)}'
+        result = subprocess.run(
+            ['ssh', *self.options, self.host, f'mkdir -p "$(dirname {target})" && cat > {target}'],
+            input=content, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        if result.returncode != 0:
+            raise TransportError(result.stderr.decode(errors='replace').strip() or f"exit code {result.returncode}")
+    
+    def start(self, script: str, stdout, stderr) -> subprocess.Popen:
+        return subprocess.Popen(['ssh', *self.options, self.host, script],
+                                stdin=subprocess.DEVNULL, stdout=stdout, stderr=stderr)
+    
+    def unreachable(self, returncode: int) -> bool:
+        return returncode == SSH_CONNECT_FAILED
+
+
+class LocalTransport(Transport):
+    """Every host is a directory on this machine, used as its HOME"""
+    
+    def __init__(self, host: str, root: Path, omakub_path: Path):
+        super().__init__(host)
+        self.home = Path(root) / host
+        self.omakub_path = omakub_path
+    
+    def put(self, content: bytes, path: str):
+        target = self.home / path
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+    
+    def start(self, script: str, stdout, stderr) -> subprocess.Popen:
+        self.home.mkdir(parents=True, exist_ok=True)
+        env = {**os.environ, 'HOME': str(self.home), 'OMAKUB_PATH': str(self.omakub_path)}
+        # Like a host reached over ssh: no desktop session to theme
+        env.pop('DISPLAY', None)
+        env.pop('WAYLAND_DISPLAY', None)
+        return subprocess.Popen(['bash', '-c', script], env=env,
+                                stdin=subprocess.DEVNULL, stdout=stdout, stderr=stderr)
+
+
+@dataclass
+class HostResult:
+    host: str
+    status: str = 'pending'  # ok, failed, unreachable, error, planned
+    installed: int = 0
+    failed: List[str] = field(default_factory=list)  # Components that failed
+    failed_count: int = 0  # As the host's orchestrator counted them
+    duration: float = 0.0
+    predicted: Optional[float] = None  # --plan: predicted install time
+    error: Optional[str] = None
+    log: Optional[str] = None
+
+
+class Rollout:
+    """Runs the orchestrator on every host, at most `concurrency` at a time
+    
+    Each host's orchestrator writes its progress events to fd 3, which the
+    remote script points at the transport's stdout; its normal output goes
+    to stderr and into the host's log file. With `max_failures`, no new
+    hosts are started once that many have failed.
+    """
+    
+    def __init__(self, hosts: List[str], transport: Callable[[str], Transport],
+                 config: Optional[Path] = None, concurrency: int = 4,
+                 orchestrator_args: Optional[List[str]] = None,
+                 remote_path: str = REMOTE_OMAKUB_PATH, orchestrator: Optional[str] = None,
+                 max_failures: Optional[int] = None, log_dir: Optional[Path] = None,
+                 state_file: Path = ROLLOUT_STATE):
+        self.hosts = hosts
+        self.transport = transport
+        self.config = Path(config) if config else None
+        self.concurrency = max(1, concurrency)
+        self.orchestrator_args = orchestrator_args or []
+        self.remote_path = remote_path
+        self.orchestrator = orchestrator  # Default: the one in the hosts' checkout
+        self.max_failures = max_failures
+        self.log_dir = log_dir or ROLLOUT_DIR / time.strftime('%Y%m%d-%H%M%S')
+        self.state_store = StateStore(state_file)
+        self.results: Dict[str, HostResult] = {}
+    
+    def remote_script(self) -> str:
+        """Shell script that runs the orchestrator on a host"""
+        args = ' '.join(shlex.quote(arg) for arg in ['--events-fd', '3', *self.orchestrator_args])
+        orchestrator = shlex.quote(self.orchestrator) if self.orchestrator else '"$OMAKUB_PATH/install/orchestrator.py"'
+        return (
+            f'OMAKUB_PATH="${{OMAKUB_PATH:-{self.remote_path}}}"; export OMAKUB_PATH; '
+            f'exec 3>&1 1>&2 && exec python3 {orchestrator} {args}'
+        )
+    
+    def run(self) -> Dict[str, HostResult]:
+        self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.state_store.load()  # Hosts not in this rollout keep their entries
+        pending = list(self.hosts)
+        running = {}
+        failures = 0
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while pending or running:
+                while pending and len(running) < self.concurrency:
+                    if self.max_failures is not None and failures >= self.max_failures:
+                        for host in pending:
+                            self.results[host] = HostResult(host, status='skipped',
+                                                            error=f"Stopped after {failures} failed hosts")
+                        pending = []
+                        break
+                    host = pending.pop(0)
+                    print(f"🖥️  {host}: starting")
+                    running[pool.submit(self.run_host, host)] = host
+                if not running:
+                    break
+                
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    host = running.pop(future)
+                    result = future.result()
+                    self.results[host] = result
+                    if result.status not in ('ok', 'planned'):
+                        failures += 1
+                    self._report(result)
+        
+        self.state_store.close()
+        return {host: self.results[host] for host in self.hosts if host in self.results}
+    
+    def run_host(self, host: str) -> HostResult:
+        """Run one host to completion, recording the outcome"""
+        result = HostResult(host, log=str(self.log_dir / f"{UNSAFE_FILENAME.sub('_', host)}.log"))
+        transport = self.transport(host)
+        start = time.monotonic()
+        
+        with open(result.log, 'wb') as log:
+            try:
+                if self.config:
+                    transport.put(self.config.read_bytes(), '.bentobox-config.yaml')
+                process = transport.start(self.remote_script(), stdout=subprocess.PIPE, stderr=log)
+            except (OSError, TransportError) as e:
+                result.status, result.error = 'unreachable', str(e)
+            else:
+                finished = None
+                for line in process.stdout:
+                    try:
+                        event = json.loads(line)
+                    except ValueError:
+                        continue
+                    finished = self._on_event(result, event) or finished
+                returncode = process.wait()
+                
+                if transport.unreachable(returncode):
+                    result.status, result.error = 'unreachable', f"exit code {returncode} (see log)"
+                elif result.predicted is not None:
+                    result.status = 'planned'
+                elif finished is None:
+                    result.status, result.error = 'error', f"Orchestrator exited with code {returncode} (see log)"
+                else:
+                    # The host's own totals; events may not name every failure
+                    result.installed = finished.get('success', result.installed)
+                    result.failed_count = max(finished.get('failed') or 0, len(result.failed))
+                    if finished.get('cancelled'):
+                        result.status, result.error = 'cancelled', f"{finished['cancelled']} components not installed"
+                    elif result.failed_count:
+                        result.status = 'failed'
+                    else:
+                        result.status = 'ok'
+        
+        result.duration = time.monotonic() - start
+        if result.status != 'planned':  # --only-failed goes by the last real rollout
+            self.state_store.record(host, **{k: v for k, v in asdict(result).items() if k != 'host'})
+        return result
+    
+    def _on_event(self, result: HostResult, event: dict) -> Optional[dict]:
+        """Fold one orchestrator event into the host's result"""
+        kind = event.get('event')
+        if kind == 'component_finished':
+            if event.get('status') == 'installed':
+                result.installed += 1
+        elif kind == 'component_status':
+            # Also covers components failed without running (a prerequisite
+            # failed, or a dependency cycle), which get no component_finished
+            name = event.get('component')
+            if event.get('status') == 'failed' and name not in result.failed:
+                result.failed.append(name)
+            elif event.get('status') != 'failed' and name in result.failed:
+                result.failed.remove(name)
+        elif kind == 'plan':
+            result.predicted = event.get('predicted') or 0.0
+        elif kind == 'run_finished':
+            return event
+        return None
+    
+    def _report(self, result: HostResult):
+        if result.status == 'ok':
+            print(f"✅ {result.host}: {result.installed} installed in {format_duration(result.duration)}")
+        elif result.status == 'planned':
+            print(f"🗺️  {result.host}: predicted {format_duration(result.predicted)}")
+        elif result.status == 'failed':
+            print(f"⚠️  {result.host}: {result.failed_count} failed ({', '.join(result.failed)})")
+        else:
+            print(f"❌ {result.host}: {result.status}: {result.error}")
+    
+    def predicted_total(self) -> float:
+        """Rollout time if every host takes its predicted time (--plan)"""
+        slots = [0.0] * self.concurrency
+        for host in self.hosts:
+            result = self.results.get(host)
+            if result and result.predicted is not None:
+                slots[slots.index(min(slots))] += result.predicted
+        return max(slots)
+    
+    def print_summary(self):
+        print("\n" + "=" * 50)
+        print("📊 Rollout Summary")
+        print("=" * 50)
+        for result in (self.results[h] for h in self.hosts if h in self.results):
+            detail = {
+                'ok': f"{result.installed} installed",
+                'planned': f"predicted {format_duration(result.predicted or 0)}",
+                'failed': f"failed: {', '.join(result.failed)}",
+            }.get(result.status, result.error or '')
+            print(f"  {result.host:<24} {result.status:<12} {format_duration(result.duration):>8}  {detail}")
+        
+        counts: Dict[str, int] = {}
+        for result in self.results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        print(f"\n  {', '.join(f'{n} {status}' for status, n in sorted(counts.items()))}")
+        if any(r.status == 'planned' for r in self.results.values()):
+            print(f"⏱️  Predicted rollout time: {format_duration(self.predicted_total())} "
+                  f"at {self.concurrency} hosts at a time (installers only)")
+        print(f"📝 Logs: {self.log_dir}")
+
+
+def read_hosts(path: Path) -> List[str]:
+    """One host per line; blank lines and # comments are ignored"""
+    hosts = []
+    for line in path.read_text().splitlines():
+        line = line.split('#', 1)[0].strip()
+        if line:
+            hosts.append(line)
+    return hosts
+
+
+def build_stub_tree(root: Path, size: int, fail: Iterable[str] = (), cycle: bool = False) -> Path:
+    """Generate a tree of stub installers to roll out locally, returning its config
+    
+    The stubs are benchmark.py's, in a tree of prerequisites; `fail` names
+    stubs that exit 1, and `cycle` adds two components requiring each other.
+    """
+    from benchmark import build_tree
+    
+    shutil.rmtree(root, ignore_errors=True)
+    build_tree(root, size, 'tree', 0.01, 0, 0.0, 0.0, 0.0, seed=0)
+    terminal_dir = root / 'install/terminal'
+    for name in fail:
+        script = terminal_dir / f"app-{name.replace('_', '-')}.sh"
+        script.write_text(script.read_text().replace('exit 0', 'exit 1'))
+    if cycle:
+        (terminal_dir / 'app-cycle-a.sh').write_text('#!/bin/bash\n# REQUIRES: cycle-b\nexit 0\n')
+        (terminal_dir / 'app-cycle-b.sh').write_text('#!/bin/bash\n# REQUIRES: cycle-a\nexit 0\n')
+    
+    config = root / 'bentobox-config.yaml'
+    config.write_text("mode: unattended\nsettings:\n  batch_apt: false\n")
+    return config
+
+
+def self_check(hosts: int = 4, concurrency: int = 2, size: int = 8) -> bool:
+    """Roll stubs out to local hosts and compare the results with each host's state
+    
+    Every host runs the same tree: one stub fails, the stubs that require
+    it fail without running, and two components form a dependency cycle.
+    """
+    with tempfile.TemporaryDirectory(prefix='bentobox-rollout-check-') as workdir:
+        workdir = Path(workdir)
+        config = build_stub_tree(workdir / 'stubs', size, fail=['stub_0001'], cycle=True)
+        names = [f'check-{i}' for i in range(1, hosts + 1)]
+        rollout = Rollout(
+            names, lambda host: LocalTransport(host, workdir / 'hosts', workdir / 'stubs'),
+            config=config, concurrency=concurrency, orchestrator=str(LOCAL_ORCHESTRATOR),
+            orchestrator_args=['--skip-post-install'], log_dir=workdir / 'logs',
+            state_file=workdir / 'rollout-state.json'
+        )
+        results = rollout.run()
+        recorded = StateStore(workdir / 'rollout-state.json').load().get('components', {})
+        
+        problems = []
+        for host in names:
+            result = results.get(host)
+            if result is None:
+                problems.append(f"{host}: no result")
+                continue
+            if not result.log or not Path(result.log).stat().st_size:
+                problems.append(f"{host}: empty log")
+            if (recorded.get(host) or {}).get('status') != result.status:
+                problems.append(f"{host}: rollout state has {recorded.get(host)!r}")
+            
+            state = StateStore(workdir / 'hosts' / host / '.bentobox-state.json').load().get('components', {})
+            failed = sorted(name for name, entry in state.items() if entry.get('status') == 'failed')
+            installed = sum(1 for entry in state.values() if entry.get('status') == 'installed')
+            if sorted(result.failed) != failed or result.failed_count != len(failed):
+                problems.append(f"{host}: reported {result.failed_count} failed {sorted(result.failed)}, "
+                                f"host state has {failed}")
+            if result.installed != installed:
+                problems.append(f"{host}: reported {result.installed} installed, host state has {installed}")
+            if result.status != 'failed' or not {'stub_0001', 'cycle_a', 'cycle_b'} <= set(failed):
+                problems.append(f"{host}: {result.status}, expected the stub and cycle failures")
+        
+        rollout.print_summary()
+        for problem in problems:
+            print(f"❌ {problem}")
+        if not problems:
+            print(f"✅ Rollout check passed: {hosts} hosts, {concurrency} at a time")
+        return not problems
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the Bentobox orchestrator on many hosts",
+        epilog="Arguments after -- are passed to orchestrator.py on every host"
+    )
+    parser.add_argument('hosts', nargs='*', help="Hosts to install ([user@]host)")
+    parser.add_argument('--hosts', dest='hosts_file', type=Path, help="File listing hosts, one per line")
+    parser.add_argument('--config', type=Path, help="Config to install as ~/.bentobox-config.yaml on every host")
+    parser.add_argument('-c', '--concurrency', type=int, default=4, help="Hosts to run at the same time")
+    parser.add_argument('--max-failures', type=int, help="Start no more hosts once this many have failed")
+    parser.add_argument('--only-failed', action='store_true', help="Only hosts whose last rollout didn't succeed")
+    parser.add_argument('--plan', action='store_true', help="Show each host's plan and the predicted rollout time")
+    parser.add_argument('--transport', choices=['ssh', 'local'], default='ssh')
+    parser.add_argument('--ssh-option', action='append', default=[], metavar='OPTION',
+                        help="Extra ssh -o option, e.g. User=admin (repeatable)")
+    parser.add_argument('--remote-path', default=REMOTE_OMAKUB_PATH, help="Bentobox checkout on the hosts")
+    parser.add_argument('--orchestrator', help="orchestrator.py to run (default: the hosts' checkout's; "
+                                               "with --transport local, this checkout's)")
+    parser.add_argument('--local-root', type=Path, default=ROLLOUT_DIR / 'hosts',
+                        help="Local transport: directory holding each host's HOME")
+    parser.add_argument('--omakub-path', type=Path, help="Local transport: tree whose installers the hosts run")
+    parser.add_argument('--stubs', type=int, metavar='N',
+                        help="Local transport: install N generated stub installers instead")
+    parser.add_argument('--check', action='store_true', help="Check fan-out and aggregation with local stub hosts")
+    argv = sys.argv[1:]
+    passthrough = []
+    if '--' in argv:
+        argv, passthrough = argv[:argv.index('--')], argv[argv.index('--') + 1:]
+    args = parser.parse_args(argv)
+    if args.check:
+        sys.exit(0 if self_check() else 1)
+    
+    hosts = list(args.hosts)
+    if args.hosts_file:
+        hosts += read_hosts(args.hosts_file)
+    hosts = list(dict.fromkeys(hosts))
+    if args.only_failed:
+        previous = StateStore(ROLLOUT_STATE).load().get('components', {})
+        hosts = [h for h in hosts if (previous.get(h) or {}).get('status') != 'ok']
+    if not hosts:
+        parser.error("no hosts to run (give hosts or --hosts FILE)")
+    
+    orchestrator = args.orchestrator
+    config = args.config
+    if args.transport == 'local':
+        if args.stubs:
+            omakub_path = args.local_root / '.stubs'
+            stub_config = build_stub_tree(omakub_path, args.stubs)
+            config = config or stub_config
+            if '--skip-post-install' not in passthrough:
+                passthrough.append('--skip-post-install')
+        elif args.omakub_path:
+            omakub_path = args.omakub_path.resolve()
+        else:
+            # The installers are real: this machine would be installed once per host
+            parser.error("the local transport needs --stubs N or --omakub-path")
+        orchestrator = orchestrator or str(LOCAL_ORCHESTRATOR)
+        transport = lambda host: LocalTransport(host, args.local_root, omakub_path)
+    else:
+        options = [opt for option in args.ssh_option for opt in ('-o', option)]
+        transport = lambda host: SSHTransport(host, options)
+    
+    orchestrator_args = (['--plan'] if args.plan else []) + passthrough
+    rollout = Rollout(hosts, transport, config=config, concurrency=args.concurrency,
+                      orchestrator_args=orchestrator_args, remote_path=args.remote_path,
+                      orchestrator=orchestrator, max_failures=args.max_failures)
+    
+    print(f"🚀 Bentobox rollout: {len(hosts)} hosts, {rollout.concurrency} at a time")
+    results = rollout.run()
+    rollout.print_summary()
+    sys.exit(0 if all(r.status in ('ok', 'planned') for r in results.values()) else 1)
+
+
+if __name__ == '__main__':
+    main()
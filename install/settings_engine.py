@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Bentobox Settings Engine
+Applies a batch of GSettings keys in one process: values are compared with
+what is already set and only the keys that differ are written, with one
+delayed apply per schema.
+
+Used from bash through install/lib/gsettings-batch.sh, which collects
+`gsettings set` calls and pipes them here as NUL-separated
+schema[:path], key, value triples:
+
+    python3 install/settings_engine.py apply < batch
+"""
+
+import sys
+import shutil
+import argparse
+import subprocess
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import gi
+    gi.require_version('Gio', '2.0')
+    from gi.repository import Gio, GLib
+    GIO_AVAILABLE = True
+except (ImportError, ValueError):
+    GIO_AVAILABLE = False
+
+
+@dataclass
+class SettingsResult:
+    changed: List[str]  # "schema key" of every key written
+    unchanged: int
+    skipped: List[str]  # Unknown schemas or keys, or values that didn't parse
+
+
+class SettingsEngine:
+    """Desired GSettings values, applied as a diff
+    
+    Values are GVariant text, exactly as given to `gsettings set`; a later
+    value for the same key replaces an earlier one.
+    """
+    
+    def __init__(self):
+        self.desired: Dict[Tuple[str, Optional[str]], Dict[str, str]] = {}
+    
+    def set(self, schema: str, key: str, value: str):
+        schema, _, path = schema.partition(':')
+        self.desired.setdefault((schema, path or None), {})[key] = value
+    
+    def apply(self, dry_run: bool = False) -> SettingsResult:
+        if GIO_AVAILABLE:
+            return self._apply_gio(dry_run)
+        return self._apply_gsettings(dry_run)
+    
+    def _apply_gio(self, dry_run: bool) -> SettingsResult:
+        source = Gio.SettingsSchemaSource.get_default()
+        result = SettingsResult(changed=[], unchanged=0, skipped=[])
+        batches = []
+        
+        for (schema_id, path), keys in self.desired.items():
+            # Gio aborts the process on unknown schemas, so look first
+            schema = source.lookup(schema_id, True) if source else None
+            if schema is None or (schema.get_path() is None) != (path is not None):
+                result.skipped += [f"{schema_id} {key}" for key in keys]
+                continue
+            settings = Gio.Settings.new_full(schema, None, path)
+            
+            changes = {}
+            for key, text in keys.items():
+                if not schema.has_key(key):
+                    result.skipped.append(f"{schema_id} {key}")
+                    continue
+                schema_key = schema.get_key(key)
+                value = self._parse(schema_key.get_value_type(), text)
+                if value is None or not schema_key.range_check(value):
+                    result.skipped.append(f"{schema_id} {key}")
+                elif settings.get_value(key).equal(value):
+                    result.unchanged += 1
+                else:
+                    changes[key] = value
+                    result.changed.append(f"{schema_id} {key}")
+            
+            if changes and not dry_run:
+                batches.append((settings, changes))
+        
+        for settings, changes in batches:
+            settings.delay()
+            for key, value in changes.items():
+                settings.set_value(key, value)
+            settings.apply()
+        if batches:
+            Gio.Settings.sync()  # Block until dconf has written everything
+        return result
+    
+    @staticmethod
+    def _parse(value_type, text: str):
+        """Parse like `gsettings set`: GVariant text, or a bare string"""
+        try:
+            return GLib.Variant.parse(value_type, text, None, None)
+        except GLib.Error:
+            if value_type.is_subtype_of(GLib.VariantType.new('s')):
+                return GLib.Variant('s', text)
+            return None
+    
+    def _apply_gsettings(self, dry_run: bool) -> SettingsResult:
+        """Without PyGObject: one `gsettings set` per key, as the scripts did"""
+        result = SettingsResult(changed=[], unchanged=0, skipped=[])
+        if not shutil.which('gsettings'):
+            result.skipped = [f"{schema} {key}" for (schema, _), keys in self.desired.items() for key in keys]
+            return result
+        
+        for (schema, path), keys in self.desired.items():
+            target = f"{schema}:{path}" if path else schema
+            for key, value in keys.items():
+                if dry_run:
+                    result.changed.append(f"{schema} {key}")
+                    continue
+                completed = subprocess.run(['gsettings', 'set', target, key, value],
+                                           stderr=subprocess.DEVNULL, check=False)
+                if completed.returncode == 0:
+                    result.changed.append(f"{schema} {key}")
+                else:
+                    result.skipped.append(f"{schema} {key}")
+        return result
+
+
+def read_batch(stream) -> List[Tuple[str, str, str]]:
+    """Parse NUL-separated schema, key, value triples"""
+    fields = stream.read().split(b'\0')
+    if fields and fields[-1] == b'':
+        fields.pop()
+    fields = [f.decode('utf-8', errors='replace') for f in fields]
+    return [tuple(fields[i:i + 3]) for i in range(0, len(fields) - len(fields) % 3, 3)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply a batch of GSettings keys, writing only what changed")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    apply_parser = subparsers.add_parser('apply', help="Read schema/key/value triples (NUL-separated) from stdin")
+    apply_parser.add_argument('--dry-run', action='store_true', help="Show what would change without writing")
+    apply_parser.add_argument('-q', '--quiet', action='store_true', help="Only report problems")
+    args = parser.parse_args()
+    
+    engine = SettingsEngine()
+    for schema, key, value in read_batch(sys.stdin.buffer):
+        engine.set(schema, key, value)
+    result = engine.apply(dry_run=args.dry_run)
+    
+    if not args.quiet:
+        for name in result.changed:
+            print(f"  {'would set' if args.dry_run else '✓'} {name}")
+        total = len(result.changed) + result.unchanged
+        print(f"⚙️  {len(result.changed)} of {total} settings changed")
+    for name in result.skipped:
+        print(f"  ⏭️  Skipped {name} (schema or key not available)", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
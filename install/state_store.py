@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Bentobox State Store
+Crash-safe installation state: a JSON snapshot plus an append-only journal
+of component status transitions, compacted back into the snapshot.
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict
+
+
+class StateStore:
+    """Installation state kept as snapshot + journal
+    
+    Every status change is appended to the journal as one JSON line, so a
+    write costs the same no matter how many components there are. Every
+    `compact_every` records (and on close) the full state is written to a
+    temp file, fsynced and atomically renamed over the snapshot, then the
+    journal is truncated. Readers load the snapshot and replay the journal;
+    a line torn by a crash is skipped.
+    """
+    
+    def __init__(self, state_file: Path, compact_every: int = 64):
+        self.state_file = Path(state_file)
+        self.journal_file = self.state_file.with_suffix('.journal')
+        self.compact_every = compact_every
+        
+        self.state: Dict[str, dict] = {'components': {}}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._records_since_compact = 0
+    
+    def load(self) -> dict:
+        """Load the snapshot and replay any journal written after it"""
+        state = {'components': {}}
+        if self.state_file.exists():
+            try:
+                with open(self.state_file) as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                pass
+        state.setdefault('components', {})
+        
+        if self.journal_file.exists():
+            with open(self.journal_file) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # Torn write from a crash
+                    self._apply(state, record)
+        
+        # Callers keep what was loaded; later records must not change it
+        self.state = {**state, 'components': {k: dict(v) for k, v in state['components'].items()}}
+        return state
+    
+    def record(self, name: str, **fields):
+        """Append one component's new fields to the journal"""
+        record = {'component': name, 'time': time.time(), **fields}
+        line = (json.dumps(record) + '\n').encode()
+        
+        with self._lock:
+            if self._journal is None:
+                self._journal = os.open(self.journal_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            os.write(self._journal, line)
+            os.fsync(self._journal)
+            self._apply(self.state, record)
+            
+            self._records_since_compact += 1
+            if self._records_since_compact >= self.compact_every:
+                self._compact()
+    
+    def replace(self, components: Dict[str, dict]):
+        """Replace the whole component map and write it out as a snapshot"""
+        with self._lock:
+            self.state['components'] = {name: dict(info) for name, info in components.items()}
+            self._compact()
+    
+    def close(self):
+        """Compact and release the journal"""
+        with self._lock:
+            self._compact()
+            if self._journal is not None:
+                os.close(self._journal)
+                self._journal = None
+    
+    def _compact(self):
+        tmp_file = self.state_file.with_suffix('.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(self.state, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.state_file)
+        self._fsync_dir()
+        
+        # Only now is it safe to drop the records the snapshot contains
+        if self._journal is not None:
+            os.ftruncate(self._journal, 0)
+        elif self.journal_file.exists():
+            self.journal_file.unlink()
+        self._records_since_compact = 0
+    
+    def _fsync_dir(self):
+        try:
+            fd = os.open(self.state_file.parent, os.O_RDONLY)
+        except OSError:
+            return
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    @staticmethod
+    def _apply(state: dict, record: dict):
+        fields = {k: v for k, v in record.items() if k not in ('component', 'time')}
+        state['components'].setdefault(record['component'], {}).update(fields)
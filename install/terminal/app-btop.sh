@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: btop --version
 
 # This script installs btop, a resource monitor that shows usage and stats for processor, memory, disks, network and processes.
 if ! command -v btop &> /dev/null; then
@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: fastfetch --version
 
 # Display system information in the terminal
 if ! command -v fastfetch &> /dev/null; then
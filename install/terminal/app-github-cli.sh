@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: gh --version
 
 if ! command -v gh &> /dev/null; then
     if [ ! -f /etc/apt/sources.list.d/github-cli.list ]; then
@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: lazygit --version
 
 if ! command -v lazygit &> /dev/null; then
     cd /tmp
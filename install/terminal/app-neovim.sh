@@ -1,4 +1,6 @@
 #!/bin/bash
+# CHECK_COMMAND: nvim --version
+# ARTIFACTS: https://github.com/neovim/neovim/releases/download/stable/nvim-linux-x86_64.tar.gz
 
 # Check if Neovim should be skipped (already installed)
 if [ "$SKIP_NEOVIM" = "true" ]; then
@@ -6,8 +8,10 @@ if [ "$SKIP_NEOVIM" = "true" ]; then
     exit 0
 fi
 
+source $OMAKUB_PATH/install/lib/artifacts.sh
+
 cd /tmp
-wget -O nvim.tar.gz "https://github.com/neovim/neovim/releases/download/stable/nvim-linux-x86_64.tar.gz"
+bentobox_fetch "https://github.com/neovim/neovim/releases/download/stable/nvim-linux-x86_64.tar.gz" nvim.tar.gz
 tar -xf nvim.tar.gz
 sudo install nvim-linux-x86_64/bin/nvim /usr/local/bin/nvim
 sudo cp -R nvim-linux-x86_64/lib /usr/local/
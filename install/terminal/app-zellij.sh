@@ -1,8 +1,11 @@
 #!/bin/bash
+# CHECK_COMMAND: zellij --version
+# ARTIFACTS: https://github.com/zellij-org/zellij/releases/latest/download/zellij-x86_64-unknown-linux-musl.tar.gz
 
 if ! command -v zellij &> /dev/null; then
+    source $OMAKUB_PATH/install/lib/artifacts.sh
     cd /tmp
-    wget -O zellij.tar.gz "https://github.com/zellij-org/zellij/releases/latest/download/zellij-x86_64-unknown-linux-musl.tar.gz"
+    bentobox_fetch "https://github.com/zellij-org/zellij/releases/latest/download/zellij-x86_64-unknown-linux-musl.tar.gz" zellij.tar.gz
     tar -xf zellij.tar.gz zellij
     sudo install zellij /usr/local/bin
     rm zellij.tar.gz zellij
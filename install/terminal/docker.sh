@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: docker --version
 
 # Check if Docker should be skipped (already installed)
 if [ "$SKIP_DOCKER" = "true" ]; then
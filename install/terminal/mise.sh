@@ -1,4 +1,5 @@
 #!/bin/bash
+# CHECK_COMMAND: mise --version
 
 # Install mise for managing multiple versions of languages. See https://mise.jdx.dev/
 if ! command -v mise &> /dev/null; then
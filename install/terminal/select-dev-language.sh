@@ -1,4 +1,5 @@
 #!/bin/bash
+# REQUIRES: mise, libraries
 
 # Load languages from config file if it exists
 CONFIG_FILE="$HOME/.bentobox-config.yaml"
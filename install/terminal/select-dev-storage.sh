@@ -1,4 +1,5 @@
 #!/bin/bash
+# REQUIRES: docker
 
 # Load containers from config file if it exists
 CONFIG_FILE="$HOME/.bentobox-config.yaml"
@@ -1,5 +1,9 @@
 #!/bin/bash
 
+# Collect every key below and write only what changed, in one go
+source $OMAKUB_PATH/install/lib/gsettings-batch.sh
+gsettings_batch_begin
+
 gsettings set org.gnome.desktop.interface color-scheme 'prefer-dark'
 gsettings set org.gnome.desktop.interface cursor-theme 'Yaru'
 gsettings set org.gnome.desktop.interface gtk-theme "Yaru-$OMAKUB_THEME_COLOR-dark"
@@ -16,3 +20,5 @@ if [ ! -d "$BACKGROUND_DEST_DIR" ]; then mkdir -p "$BACKGROUND_DEST_DIR"; fi
 gsettings set org.gnome.desktop.background picture-uri $BACKGROUND_DEST_PATH
 gsettings set org.gnome.desktop.background picture-uri-dark $BACKGROUND_DEST_PATH
 gsettings set org.gnome.desktop.background picture-options 'zoom'
+
+gsettings_batch_apply --quiet